@@ -8,15 +8,95 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 import os
-
-from scipy import fftpack
-from scipy.signal import find_peaks
-from datetime import datetime, timedelta
-from astropy.time import Time
+import math
+import hashlib
+
+from datetime import datetime
+
+# scipy and astropy are imported inside the methods that use them to keep GUI startup fast
+
+MINUTES_PER_DAY = 1440.0
+SECONDS_PER_DAY = 86400.0
+
+_mean_std_kernel = None
+
+
+def _welford_mean_std(values):
+    """Mean and population standard deviation in a single pass (Welford)"""
+    mean = 0.0
+    m2 = 0.0
+    for i in range(values.shape[0]):
+        delta = values[i] - mean
+        mean += delta / (i + 1)
+        m2 += delta * (values[i] - mean)
+    return mean, math.sqrt(m2 / values.shape[0])
+
+
+def minmax_decimate(x, y, max_bins, log_x=False):
+    """Reduce a line to the min and max point of each bin, preserving its visual envelope
+
+    Bins are equal steps of x (of log10(x) with log_x, for a log-scaled axis),
+    so each one covers about one pixel column of the plot.
+    """
+    n = len(y)
+    if n <= 2 * max_bins:
+        return x, y
+    coord = np.log10(x) if log_x else x
+    lo, hi = coord.min(), coord.max()
+    if hi > lo:
+        bins = ((coord - lo) * (max_bins / (hi - lo))).astype(np.intp)
+        np.minimum(bins, max_bins - 1, out=bins)
+    else:
+        bins = np.zeros(n, dtype=np.intp)
+    # Sort by bin, then by y: the first and last point of each bin are its min and max
+    order = np.lexsort((y, bins))
+    sorted_bins = bins[order]
+    starts = np.flatnonzero(np.r_[True, sorted_bins[1:] != sorted_bins[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    keep = np.unique(np.concatenate([order[starts], order[ends]]))
+    return x[keep], y[keep]
+
+
+def sampling_step(time_data):
+    """Time step of a sorted series and whether it is regularly sampled
+
+    The series counts as regular when every timestamp lies on the
+    start + k*step grid to within a few float64 ulps of the timestamps
+    themselves (Julian Dates near 2.46e6 are only resolved to ~4.7e-10 d).
+    Otherwise the median step is returned.
+    """
+    n = len(time_data)
+    step = (time_data[-1] - time_data[0]) / (n - 1)
+    tolerance = 4 * np.spacing(max(abs(time_data[0]), abs(time_data[-1])))
+
+    # Distance of each timestamp from the regular grid, built in one buffer
+    deviation = np.arange(n, dtype=np.float64)
+    deviation *= step
+    deviation += time_data[0]
+    deviation -= time_data
+    if np.max(np.abs(deviation, out=deviation)) <= tolerance:
+        return step, True
+    return np.median(np.diff(time_data)), False
+
+
+def _numpy_mean_std(values):
+    """Mean and population standard deviation with numpy, used without numba"""
+    return np.mean(values), np.std(values)
+
+
+def mean_std(values):
+    """Mean and standard deviation of a 1-D array, JIT-compiled with numba when installed"""
+    global _mean_std_kernel
+    if _mean_std_kernel is None:
+        try:
+            from numba import njit
+            _mean_std_kernel = njit(cache=True)(_welford_mean_std)
+        except ImportError:
+            _mean_std_kernel = _numpy_mean_std
+    return _mean_std_kernel(values)
 
 class StarPeriodAnalyzer:
     def __init__(self, root):
@@ -29,6 +109,15 @@ class StarPeriodAnalyzer:
         self.reference_data = None
         self.magnitude_results = None
         self.fft_data = None
+        self.fft_lengths = {}  # Series length -> padded fast FFT length
+        self.fft_cache = {}  # Hash of cleaned series -> periodogram results
+        self.fft_plot_key = None  # Cache key of the series currently drawn on the FFT tab
+
+        # Magnitude plot artists, reused between runs
+        self.mag_ax = None
+        self.mag_lines = {}
+        self.mag_stats_text = None
+        self.mag_plot_layout = None
 
         # Variables for Tab 1
         self.target_file = tk.StringVar()  # Full path
@@ -299,147 +388,138 @@ class StarPeriodAnalyzer:
             self.reference_file.set(filename)
             self.reference_file_display.set(os.path.basename(filename))
 
-    def calculate_julian_date(self, start_datetime, frame_number, gap_seconds):
-        """Calculate Julian Date for a given frame"""
+    def calculate_julian_dates(self, start_datetime, num_frames, gap_seconds):
+        """Calculate Julian Dates for all frames in a single vectorized conversion"""
+        from astropy.time import Time, TimeDelta
+
         try:
-            # Parse the start datetime
+            # Parse the start datetime once
             start_dt = datetime.strptime(start_datetime, "%Y-%m-%d %H:%M:%S")
 
-            # Add the time offset for this frame
-            frame_dt = start_dt + timedelta(seconds=frame_number * gap_seconds)
+            # Time offset of each frame from the first one
+            offsets = np.arange(num_frames) * gap_seconds
 
-            # Convert to Julian Date using astropy
-            t = Time(frame_dt)
+            # Convert to Julian Dates using astropy
+            t = Time(start_dt) + TimeDelta(offsets, format='sec')
             return t.jd
         except Exception as e:
             raise ValueError(f"Error calculating Julian Date: {str(e)}")
 
-    def calculate_flux_from_rgb(self, r_flux, g_flux, b_flux, r_weight, g_weight, b_weight):
-        """Calculate weighted flux from RGB values"""
-        # Normalize weights
-        total_weight = r_weight + g_weight + b_weight
+    def normalize_rgb_weights(self, r_weight, g_weight, b_weight):
+        """Normalize RGB weights so they sum to one"""
+        weights = np.array([r_weight, g_weight, b_weight], dtype=np.float32)
+        total_weight = weights.sum()
         if total_weight == 0:
             raise ValueError("RGB weights cannot all be zero")
 
-        r_norm = r_weight / total_weight
-        g_norm = g_weight / total_weight
-        b_norm = b_weight / total_weight
+        return weights / total_weight
 
-        return r_flux * r_norm + g_flux * g_norm + b_flux * b_norm
+    def calculate_flux_from_rgb(self, rgb_flux, weights):
+        """Calculate weighted flux from an (N, 3) RGB flux array and normalized weights"""
+        return rgb_flux @ weights
 
     def calculate_magnitudes(self):
         """Calculate absolute magnitudes from photometry data"""
         try:
             self.status.set("Calculating magnitudes...")
 
+            # Snapshot the GUI settings once instead of re-reading Tk variables
+            target_file = self.target_file.get()
+            reference_file = self.reference_file.get()
+            rgb_columns = [self.r_column.get(), self.g_column.get(), self.b_column.get()]
+            rgb_weights = [self.r_weight.get(), self.g_weight.get(), self.b_weight.get()]
+            use_manual_date = self.use_manual_date.get()
+            start_date = self.start_date.get()
+            reference_magnitude = np.float32(self.reference_magnitude.get())
+            frame_gap = None if use_manual_date else self.frame_gap.get()
+
             # Validate inputs
-            if not self.target_file.get() or not self.reference_file.get():
+            if not target_file or not reference_file:
                 messagebox.showerror("Error", "Please select both target and reference CSV files")
                 return
 
-            if not all([self.r_column.get(), self.g_column.get(), self.b_column.get()]):
+            if not all(rgb_columns):
                 messagebox.showerror("Error", "Please enter RGB column names")
                 return
 
-            if not all([self.r_weight.get(), self.g_weight.get(), self.b_weight.get()]):
+            if not all(rgb_weights):
                 messagebox.showerror("Error", "Please enter RGB weights")
                 return
 
-            if not self.use_manual_date.get() and not self.start_date.get():
+            if not use_manual_date and not start_date:
                 messagebox.showerror("Error", "Please enter the first image date")
                 return
 
-            # Load data
-            target_df = pd.read_csv(self.target_file.get())
-            reference_df = pd.read_csv(self.reference_file.get())
-
-            if len(target_df) != len(reference_df):
-                messagebox.showerror("Error", "Target and reference files must have the same number of rows")
-                return
-
-            # Check if specified columns exist
-            for col in [self.r_column.get(), self.g_column.get(), self.b_column.get()]:
-                if col not in target_df.columns:
+            # Check if specified columns exist by reading only the CSV headers
+            target_columns = pd.read_csv(target_file, nrows=0).columns
+            for col in rgb_columns:
+                if col not in target_columns:
                     messagebox.showerror("Error", f"Column '{col}' not found in target CSV")
                     return
-                if col not in reference_df.columns:
+
+            reference_columns = pd.read_csv(reference_file, nrows=0).columns
+            for col in rgb_columns:
+                if col not in reference_columns:
                     messagebox.showerror("Error", f"Column '{col}' not found in reference CSV")
                     return
 
-            # Calculate weighted flux for both target and reference (grayscale)
-            target_flux_gray = self.calculate_flux_from_rgb(
-                target_df[self.r_column.get()], target_df[self.g_column.get()], target_df[self.b_column.get()],
-                self.r_weight.get(), self.g_weight.get(), self.b_weight.get()
-            )
-
-            reference_flux_gray = self.calculate_flux_from_rgb(
-                reference_df[self.r_column.get()], reference_df[self.g_column.get()], reference_df[self.b_column.get()],
-                self.r_weight.get(), self.g_weight.get(), self.b_weight.get()
-            )
-
-            # Extract individual R, G, B flux values
-            target_flux_r = target_df[self.r_column.get()]
-            target_flux_g = target_df[self.g_column.get()]
-            target_flux_b = target_df[self.b_column.get()]
-
-            reference_flux_r = reference_df[self.r_column.get()]
-            reference_flux_g = reference_df[self.g_column.get()]
-            reference_flux_b = reference_df[self.b_column.get()]
-
-            # Calculate instrumental magnitudes for grayscale
-            target_inst_mag_gray = -2.5 * np.log10(target_flux_gray)
-            reference_inst_mag_gray = -2.5 * np.log10(reference_flux_gray)
-
-            # Calculate differential magnitude for grayscale
-            diff_mag_gray = target_inst_mag_gray - reference_inst_mag_gray
-
-            # Calculate absolute magnitude for grayscale
-            target_magnitude_gray = diff_mag_gray + self.reference_magnitude.get()
-
-            # Replace inf values with NaN for proper handling
-            target_magnitude_gray = np.where(np.isinf(target_magnitude_gray), np.nan, target_magnitude_gray)
-
-            # Calculate instrumental magnitudes for R channel
-            target_inst_mag_r = -2.5 * np.log10(target_flux_r)
-            reference_inst_mag_r = -2.5 * np.log10(reference_flux_r)
-            diff_mag_r = target_inst_mag_r - reference_inst_mag_r
-            target_magnitude_r = diff_mag_r + self.reference_magnitude.get()
-            target_magnitude_r = np.where(np.isinf(target_magnitude_r), np.nan, target_magnitude_r)
-
-            # Calculate instrumental magnitudes for G channel
-            target_inst_mag_g = -2.5 * np.log10(target_flux_g)
-            reference_inst_mag_g = -2.5 * np.log10(reference_flux_g)
-            diff_mag_g = target_inst_mag_g - reference_inst_mag_g
-            target_magnitude_g = diff_mag_g + self.reference_magnitude.get()
-            target_magnitude_g = np.where(np.isinf(target_magnitude_g), np.nan, target_magnitude_g)
-
-            # Calculate instrumental magnitudes for B channel
-            target_inst_mag_b = -2.5 * np.log10(target_flux_b)
-            reference_inst_mag_b = -2.5 * np.log10(reference_flux_b)
-            diff_mag_b = target_inst_mag_b - reference_inst_mag_b
-            target_magnitude_b = diff_mag_b + self.reference_magnitude.get()
-            target_magnitude_b = np.where(np.isinf(target_magnitude_b), np.nan, target_magnitude_b)
-
-            # Prepare results
-            results = pd.DataFrame()
+            # Load only the RGB flux columns, parsed straight to float32
+            column_dtypes = {col: np.float32 for col in rgb_columns}
+            target_df = pd.read_csv(target_file, usecols=rgb_columns, dtype=column_dtypes)
+            reference_df = pd.read_csv(reference_file, usecols=rgb_columns, dtype=column_dtypes)
+
+            if len(target_df) != len(reference_df):
+                messagebox.showerror("Error", "Target and reference files must have the same number of rows")
+                return
+
+            # Normalize the RGB weights once for both stars
+            weights = self.normalize_rgb_weights(*rgb_weights)
+
+            # Build (N, 4) float32 flux arrays: R, G, B and weighted grayscale
+            # (DSLR fluxes carry well under 24 bits of real precision)
+            target_flux = np.empty((len(target_df), 4), dtype=np.float32)
+            target_flux[:, :3] = target_df[rgb_columns].to_numpy(copy=False)
+            target_flux[:, 3] = self.calculate_flux_from_rgb(target_flux[:, :3], weights)
+
+            reference_flux = np.empty((len(reference_df), 4), dtype=np.float32)
+            reference_flux[:, :3] = reference_df[rgb_columns].to_numpy(copy=False)
+            reference_flux[:, 3] = self.calculate_flux_from_rgb(reference_flux[:, :3], weights)
+
+            # Non-positive fluxes have no magnitude; mark them NaN up front so it propagates
+            # through log10 instead of needing a separate inf clean-up pass afterwards
+            target_flux[target_flux <= 0] = np.nan
+            reference_flux[reference_flux <= 0] = np.nan
+
+            # Differential magnitude shifted to the reference star's absolute magnitude:
+            # -2.5*log10(F_t) - (-2.5*log10(F_r)) + m_ref == -2.5*log10(F_t/F_r) + m_ref
+            # (float32 scalars keep numexpr from promoting the result to float64)
+            magnitude_scale = np.float32(-2.5)
+            try:
+                # numexpr fuses the division, log10 and scaling into one threaded pass
+                import numexpr as ne
+                target_magnitude = ne.evaluate(
+                    "magnitude_scale * log10(target_flux / reference_flux) + reference_magnitude"
+                )
+            except ImportError:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    target_magnitude = magnitude_scale * np.log10(target_flux / reference_flux) + reference_magnitude
 
             # Julian Date calculation
-            if self.use_manual_date.get():
-                results['Julian Date'] = [''] * len(target_df)  # Empty for manual entry
+            if use_manual_date:
+                julian_dates = [''] * len(target_df)  # Empty for manual entry
             else:
-                julian_dates = []
-                for i in range(len(target_df)):
-                    jd = self.calculate_julian_date(
-                        self.start_date.get(), i, self.frame_gap.get()
-                    )
-                    julian_dates.append(jd)
-                results['Julian Date'] = julian_dates
-
-            # Add all magnitude columns (R, G, B, Grayscale)
-            results['Magnitude_Gray'] = target_magnitude_gray
-            results['Magnitude_R'] = target_magnitude_r
-            results['Magnitude_G'] = target_magnitude_g
-            results['Magnitude_B'] = target_magnitude_b
+                julian_dates = self.calculate_julian_dates(
+                    start_date, len(target_df), frame_gap
+                )
+
+            # Assemble results once: Julian Date plus all magnitude columns (Grayscale, R, G, B)
+            results = pd.DataFrame({
+                'Julian Date': julian_dates,
+                'Magnitude_Gray': target_magnitude[:, 3],
+                'Magnitude_R': target_magnitude[:, 0],
+                'Magnitude_G': target_magnitude[:, 1],
+                'Magnitude_B': target_magnitude[:, 2]
+            })
 
             self.magnitude_results = results
 
@@ -453,13 +533,15 @@ class StarPeriodAnalyzer:
             self.status.set("Error in calculation")
 
     def plot_magnitude_results(self):
-        """Plot magnitude results - all 4 channels"""
+        """Plot magnitude results - all 4 channels
+
+        The axes, lines and statistics box are built once and then updated in
+        place on later runs; they are only rebuilt when the plotted columns or
+        the x-axis type change.
+        """
         if self.magnitude_results is None:
             return
 
-        self.mag_figure.clear()
-        ax = self.mag_figure.add_subplot(111)
-
         # Define colors for each channel
         colors = {
             'Magnitude_R': '#E63946',      # Red
@@ -475,47 +557,74 @@ class StarPeriodAnalyzer:
             'Magnitude_Gray': 'Grayscale (Weighted)'
         }
 
+        # Pull each magnitude column out as an ndarray once
+        mag_columns = {col: self.magnitude_results[col].to_numpy()
+                       for col in colors if col in self.magnitude_results.columns}
+
         # Determine x-axis data
         if not self.use_manual_date.get():
-            x_data = self.magnitude_results['Julian Date']
+            x_data = self.magnitude_results['Julian Date'].to_numpy()
             xlabel = 'Julian Date (JD)'
         else:
-            x_data = range(len(self.magnitude_results))
+            x_data = np.arange(len(self.magnitude_results))
             xlabel = 'Frame Number'
 
-        # Plot all 4 magnitude curves
-        for mag_col, color in colors.items():
-            if mag_col in self.magnitude_results.columns:
-                ax.plot(x_data, self.magnitude_results[mag_col],
-                       color=color, marker='o', markersize=4, linewidth=1.5,
-                       markeredgecolor='white', markeredgewidth=0.5,
-                       label=labels[mag_col], alpha=0.8)
-
-        ax.set_xlabel(xlabel, fontsize=12, fontweight='bold')
-        ax.set_ylabel('Magnitude (mag)', fontsize=12, fontweight='bold')
-        ax.set_title('Target Star Light Curve - All Channels', fontsize=14, fontweight='bold', pad=15)
-        ax.grid(True, alpha=0.3, linestyle='--', linewidth=0.8)
-        ax.invert_yaxis()  # Invert y-axis for magnitude scale
-        ax.legend(loc='best', framealpha=0.95, fontsize=9)
+        plot_layout = (tuple(mag_columns), xlabel)
+        if self.mag_ax is None or plot_layout != self.mag_plot_layout:
+            self.mag_figure.clear()
+            ax = self.mag_figure.add_subplot(111)
+
+            # Plot all 4 magnitude curves
+            self.mag_lines = {}
+            for mag_col, color in colors.items():
+                if mag_col in mag_columns:
+                    self.mag_lines[mag_col], = ax.plot(
+                        x_data, mag_columns[mag_col],
+                        color=color, marker='o', markersize=4, linewidth=1.5,
+                        markeredgecolor='white', markeredgewidth=0.5,
+                        label=labels[mag_col], alpha=0.8)
+
+            ax.set_xlabel(xlabel, fontsize=12, fontweight='bold')
+            ax.set_ylabel('Magnitude (mag)', fontsize=12, fontweight='bold')
+            ax.set_title('Target Star Light Curve - All Channels', fontsize=14, fontweight='bold', pad=15)
+            ax.grid(True, alpha=0.3, linestyle='--', linewidth=0.8)
+            ax.invert_yaxis()  # Invert y-axis for magnitude scale
+            ax.legend(loc='best', framealpha=0.95, fontsize=9)
+
+            # Add background color
+            ax.set_facecolor('#F8F9FA')
+
+            # Statistics box, filled in below
+            self.mag_stats_text = ax.text(0.02, 0.98, '', transform=ax.transAxes,
+                   verticalalignment='top', bbox=dict(boxstyle='round', facecolor='white', alpha=0.85),
+                   fontsize=8, family='monospace')
 
-        # Add background color
-        ax.set_facecolor('#F8F9FA')
+            self.mag_ax = ax
+            self.mag_plot_layout = plot_layout
+            self.mag_figure.tight_layout()
+        else:
+            # Same layout as last time: just swap in the new data
+            for mag_col, line in self.mag_lines.items():
+                line.set_data(x_data, mag_columns[mag_col])
+            self.mag_ax.relim()
+            self.mag_ax.autoscale_view()
 
         # Add statistical info for grayscale magnitude
-        mag_gray_data = self.magnitude_results['Magnitude_Gray'].dropna()
+        mag_gray_data = mag_columns['Magnitude_Gray']
+        mag_gray_data = mag_gray_data[~np.isnan(mag_gray_data)]
         if len(mag_gray_data) > 0:
-            mean_mag = np.mean(mag_gray_data)
-            std_mag = np.std(mag_gray_data)
-            min_mag = np.min(mag_gray_data)
-            max_mag = np.max(mag_gray_data)
+            mean_mag = mag_gray_data.mean()
+            std_mag = mag_gray_data.std()
+            min_mag = mag_gray_data.min()
+            max_mag = mag_gray_data.max()
 
             stats_text = f'Grayscale Stats:\nMean: {mean_mag:.3f}\nStd: {std_mag:.3f}\nRange: {min_mag:.3f} - {max_mag:.3f}'
-            ax.text(0.02, 0.98, stats_text, transform=ax.transAxes,
-                   verticalalignment='top', bbox=dict(boxstyle='round', facecolor='white', alpha=0.85),
-                   fontsize=8, family='monospace')
+            self.mag_stats_text.set_text(stats_text)
+            self.mag_stats_text.set_visible(True)
+        else:
+            self.mag_stats_text.set_visible(False)
 
-        self.mag_figure.tight_layout()
-        self.mag_canvas.draw()
+        self.mag_canvas.draw_idle()
 
     def export_magnitude_results(self):
         """Export magnitude calculation results to CSV"""
@@ -554,6 +663,7 @@ class StarPeriodAnalyzer:
 
             # Load the data
             self.analysis_data = pd.read_csv(self.analysis_file.get())
+            self.fft_cache.clear()
 
             # Get column names
             self.available_columns = list(self.analysis_data.columns)
@@ -581,15 +691,17 @@ class StarPeriodAnalyzer:
                 messagebox.showerror("Error", "Please load data first")
                 return
 
-            if not self.time_column.get() or not self.magnitude_column.get():
+            time_column = self.time_column.get()
+            magnitude_column = self.magnitude_column.get()
+            if not time_column or not magnitude_column:
                 messagebox.showerror("Error", "Please select time and magnitude columns")
                 return
 
             self.status.set("Performing FFT analysis...")
 
             # Extract data
-            time_data = self.analysis_data[self.time_column.get()].values
-            mag_data = self.analysis_data[self.magnitude_column.get()].values
+            time_data = self.analysis_data[time_column].values
+            mag_data = self.analysis_data[magnitude_column].values
 
             # Convert to numeric, handling any non-numeric values
             time_data = pd.to_numeric(time_data, errors='coerce')
@@ -598,71 +710,56 @@ class StarPeriodAnalyzer:
             # Remove any NaN values or invalid data
             mask = ~(np.isnan(time_data) | np.isnan(mag_data))
             time_data = time_data[mask]
-            mag_data = mag_data[mask]
+            # Single precision is plenty for magnitudes and halves FFT memory traffic;
+            # time stays float64 since Julian Dates need the extra digits
+            mag_data = mag_data[mask].astype(np.float32)
 
             # Check if we have enough data
             if len(time_data) < 3:
                 messagebox.showerror("Error", "Not enough valid data points for FFT analysis")
                 return
 
-            # Calculate sampling parameters
-            dt = np.median(np.diff(time_data))  # Median time step in days
-            n = len(time_data)
-
-            # Perform FFT with time in days
-            fft_result = np.fft.fft(mag_data - np.mean(mag_data))
-            frequencies = np.fft.fftfreq(n, dt)  # Frequencies in 1/days
-
-            # Take only positive frequencies
-            positive_freq_mask = frequencies > 0
-            frequencies = frequencies[positive_freq_mask]
-            amplitudes = np.abs(fft_result[positive_freq_mask])
-
-            # Convert frequencies to periods in DAYS
-            periods = 1.0 / frequencies  # Periods in days
+            # Reuse the periodogram when the same series is analyzed again
+            key = self.fft_cache_key(time_data, mag_data)
+            result = self.fft_cache.get(key)
+            if result is None:
+                result = self.fft_cache[key] = self.compute_periodogram(time_data, mag_data)
+            periods, frequencies, amplitudes, peaks, peak_properties = result
 
-            # Find reasonable period range for display (in days)
-            min_period = 2 * dt  # Nyquist limit in days
-            max_period = (time_data[-1] - time_data[0]) / 2  # Half the total observation time in days
-
-            period_mask = (periods >= min_period) & (periods <= max_period)
-            periods = periods[period_mask]
-            amplitudes = amplitudes[period_mask]
-            frequencies = frequencies[period_mask]
-
-            # Store results
-            self.fft_data = pd.DataFrame({
+            # Store results as plain columns; a DataFrame is only built on export
+            self.fft_data = {
                 'Period': periods,
                 'Frequency': frequencies,
                 'Amplitude': amplitudes
-            })
+            }
 
             # Store time and magnitude data for plotting
             self.time_data = time_data
             self.mag_data = mag_data
 
-            # Find peaks
-            peaks, _ = find_peaks(amplitudes, height=np.max(amplitudes) * 0.1)
-
-            # Plot results
-            self.plot_fft_results(time_data, mag_data, periods, frequencies, amplitudes, peaks)
+            # Plot results, unless this exact series is already on screen
+            if key != self.fft_plot_key:
+                self.plot_fft_results(time_data, mag_data, periods, frequencies, amplitudes, peaks)
+                self.fft_plot_key = key
 
             # Report strongest periods (convert to minutes for display)
             if len(peaks) > 0:
-                peak_periods = periods[peaks] * 24 * 60  # Convert days to minutes
-                peak_amplitudes = amplitudes[peaks]
-                strongest_idx = np.argsort(peak_amplitudes)[::-1][:5]  # Top 5 peaks
+                # Top 5 peaks by height, then ordered strongest first
+                peak_heights = peak_properties['peak_heights']
+                num_top = min(5, len(peaks))
+                strongest_idx = np.argpartition(-peak_heights, num_top - 1)[:num_top]
+                strongest_idx = strongest_idx[np.argsort(-peak_heights[strongest_idx])]
+
+                peak_periods = periods[peaks[strongest_idx]] * MINUTES_PER_DAY  # Convert days to minutes
+                peak_amplitudes = peak_heights[strongest_idx]
 
                 peak_info = "Strongest Periods Detected:\n" + "="*50 + "\n\n"
-                for i in range(min(5, len(strongest_idx))):
-                    idx = strongest_idx[i]
-                    if idx < len(peaks):
-                        peak_idx = peaks[idx]
-                        period_val = peak_periods[peak_idx]
-                        amp_val = peak_amplitudes[peak_idx]
-                        peak_info += f"Rank #{i+1}:\n"
-                        peak_info += f"  Period: {period_val:.2f} minutes\n"
-                        peak_info += f"  Amplitude: {amp_val:.6f}\n\n"
+                for i in range(num_top):
+                    period_val = peak_periods[i]
+                    amp_val = peak_amplitudes[i]
+                    peak_info += f"Rank #{i+1}:\n"
+                    peak_info += f"  Period: {period_val:.2f} minutes\n"
+                    peak_info += f"  Amplitude: {amp_val:.6f}\n\n"
 
                 messagebox.showinfo("Peak Detection Results", peak_info)
 
@@ -672,27 +769,87 @@ class StarPeriodAnalyzer:
             messagebox.showerror("Error", f"Error in FFT analysis: {str(e)}")
             self.status.set("Error in FFT analysis")
 
+    def fft_cache_key(self, time_data, mag_data):
+        """Hash the cleaned time and magnitude arrays for the periodogram cache"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(time_data.tobytes())
+        digest.update(mag_data.tobytes())
+        return digest.digest()
+
+    def compute_periodogram(self, time_data, mag_data):
+        """Compute the FFT periodogram and its peaks for a cleaned time series"""
+        from scipy.fft import rfft, rfftfreq, next_fast_len
+        from scipy.signal import find_peaks, detrend
+
+        # Calculate sampling parameters
+        n = len(time_data)
+        # Regularly sampled series (fixed frame gap) take the step from the span,
+        # others the median step; in days either way
+        dt, _ = sampling_step(time_data)
+
+        # Remove the mean and any linear drift once before the transform; an
+        # end-to-end gradient otherwise leaks into spurious low-frequency peaks
+        mag_detrended = detrend(mag_data, type='linear')
+
+        # Perform real FFT with time in days, zero-padded to a fast (2/3/5/7-smooth) length
+        # (cached per length, so re-running on the same data reuses the transform size)
+        n_fft = self.fft_lengths.get(n)
+        if n_fft is None:
+            n_fft = self.fft_lengths[n] = next_fast_len(n, real=True)
+        fft_result = rfft(mag_detrended, n=n_fft, workers=-1)
+        frequencies = rfftfreq(n_fft, dt)  # Frequencies in 1/days
+
+        # rfft only returns non-negative frequencies; skip the DC term
+        frequencies = frequencies[1:]
+        amplitudes = np.abs(fft_result[1:])
+
+        # Convert frequencies to periods in DAYS
+        periods = 1.0 / frequencies  # Periods in days
+
+        # Find reasonable period range for display (in days)
+        min_period = 2 * dt  # Nyquist limit in days
+        max_period = (time_data[-1] - time_data[0]) / 2  # Half the total observation time in days
+
+        period_mask = (periods >= min_period) & (periods <= max_period)
+        periods = periods[period_mask]
+        amplitudes = amplitudes[period_mask]
+        frequencies = frequencies[period_mask]
+
+        # Find peaks, letting find_peaks filter out insignificant and adjacent maxima
+        max_amplitude = np.max(amplitudes)
+        peaks, peak_properties = find_peaks(amplitudes, height=max_amplitude * 0.1,
+                                            prominence=max_amplitude * 0.05, distance=3)
+
+        return periods, frequencies, amplitudes, peaks, peak_properties
+
     def plot_fft_results(self, time_data, mag_data, periods, frequencies, amplitudes, peaks):
         """Plot FFT analysis results with professional styling"""
         self.fft_figure.clear()
 
         # Convert periods from days to minutes for display
-        periods_minutes = periods * 24 * 60  # Convert days to minutes
+        # (single precision is plenty for display; amplitudes are already float32
+        # since the transform runs on float32 magnitudes)
+        periods_minutes = periods.astype(np.float32) * np.float32(MINUTES_PER_DAY)  # Convert days to minutes
 
         # Create 2 subplot layout (2 rows, 1 column)
         gs = self.fft_figure.add_gridspec(2, 1, hspace=0.4)
         ax1 = self.fft_figure.add_subplot(gs[0])  # Top: Time series
         ax2 = self.fft_figure.add_subplot(gs[1])  # Bottom: Period spectrum
+        ax2.set_xscale('log')  # Set before plotting so artists are built with the final transform
 
         # Color scheme
         color_data = '#2E86AB'
         color_fft = '#A23B72'
         color_peaks = '#F18F01'
 
+        # Never draw more vertices than the axes have pixels to show
+        max_bins = max(1, int(ax1.bbox.width))
+
         # ========== Subplot 1: Original Time Series (keep in Julian Date) ==========
-        ax1.plot(time_data, mag_data, color=color_data, linewidth=1.5,
+        plot_time, plot_mag = minmax_decimate(time_data, mag_data, max_bins)
+        ax1.plot(plot_time, plot_mag, color=color_data, linewidth=1.5,
                 marker='o', markersize=4, markeredgecolor='white', markeredgewidth=0.5,
-                label='Observed Data')
+                label='Observed Data', rasterized=True)
 
         ax1.set_xlabel('Julian Date (JD)', fontsize=11, fontweight='bold')
         ax1.set_ylabel('Magnitude', fontsize=11, fontweight='bold')
@@ -702,16 +859,17 @@ class StarPeriodAnalyzer:
         ax1.legend(loc='best', framealpha=0.9, fontsize=9)
 
         # Add statistics
-        mean_val = np.mean(mag_data)
-        std_val = np.std(mag_data)
-        total_duration = (time_data[-1] - time_data[0]) * 24 * 60 * 60  # Duration in seconds
+        mean_val, std_val = mean_std(mag_data)
+        total_duration = float(time_data[-1] - time_data[0]) * SECONDS_PER_DAY  # Duration in seconds
         stats_text = f'Mean: {mean_val:.4f}\nStd Dev: {std_val:.4f}\nN: {len(mag_data)}\nDuration: {total_duration:.1f}s'
         ax1.text(0.02, 0.98, stats_text, transform=ax1.transAxes,
                 verticalalignment='top', bbox=dict(boxstyle='round', facecolor='white', alpha=0.85),
                 fontsize=8, family='monospace')
 
         # ========== Subplot 2: Power Spectrum vs Period (in minutes) ==========
-        ax2.plot(periods_minutes, amplitudes, color=color_fft, linewidth=2, alpha=0.7, label='Power Spectrum')
+        plot_periods, plot_amplitudes = minmax_decimate(periods_minutes, amplitudes, max_bins, log_x=True)
+        ax2.plot(plot_periods, plot_amplitudes, color=color_fft, linewidth=2, alpha=0.7,
+                label='Power Spectrum', rasterized=True)
 
         # Mark peaks
         if len(peaks) > 0:
@@ -719,16 +877,19 @@ class StarPeriodAnalyzer:
                     markersize=8, markeredgecolor='white', markeredgewidth=1.5,
                     label='Detected Peaks', zorder=5)
 
-            # Get top 3 peaks by amplitude
+            # Get top 3 peaks by amplitude (partition first, then order just those)
             peak_amplitudes = amplitudes[peaks]
-            sorted_indices = np.argsort(peak_amplitudes)[::-1]
-            top_3_indices = sorted_indices[:min(3, len(sorted_indices))]
+            num_top = min(3, len(peak_amplitudes))
+            top_3_indices = np.argpartition(-peak_amplitudes, num_top - 1)[:num_top]
+            top_3_indices = top_3_indices[np.argsort(-peak_amplitudes[top_3_indices])]
+
+            # Gather the annotated peak positions once as plain floats
+            top_peaks = peaks[top_3_indices]
+            top_periods = periods_minutes[top_peaks].tolist()
+            top_amplitudes = amplitudes[top_peaks].tolist()
 
             # Annotate top 3 peaks with better positioning
-            for i, idx in enumerate(top_3_indices):
-                peak_idx = peaks[idx]
-                period_val = periods_minutes[peak_idx]
-                amp_val = amplitudes[peak_idx]
+            for i, (period_val, amp_val) in enumerate(zip(top_periods, top_amplitudes)):
 
                 # Annotation with clean styling - show period in minutes
                 ax2.annotate(f'#{i+1}: {period_val:.1f}min',
@@ -747,7 +908,6 @@ class StarPeriodAnalyzer:
         ax2.set_ylabel('Power Amplitude', fontsize=11, fontweight='bold')
         ax2.set_title('Periodogram - Period vs Amplitude', fontsize=12, fontweight='bold', pad=10)
         ax2.grid(True, alpha=0.3, linestyle='--', linewidth=0.8)
-        ax2.set_xscale('log')
         ax2.set_facecolor('#F8F9FA')
         ax2.legend(loc='best', framealpha=0.9, fontsize=9)
 
@@ -755,8 +915,9 @@ class StarPeriodAnalyzer:
         self.fft_figure.patch.set_facecolor('white')
         self.fft_figure.suptitle('Fourier Transform Analysis', fontsize=15, fontweight='bold', y=0.98)
 
-        self.fft_figure.tight_layout(rect=[0, 0, 1, 0.96])
-        self.fft_canvas.draw()
+        # No tight_layout here: it skips gridspecs with their own hspace, so it only
+        # cost a full layout pass (and a warning) without moving anything
+        self.fft_canvas.draw_idle()
 
     def export_fft_results(self):
         """Export FFT analysis results to CSV"""
@@ -771,7 +932,18 @@ class StarPeriodAnalyzer:
         )
 
         if filename:
-            self.fft_data.to_csv(filename, index=False)
+            try:
+                # pyarrow's C++ CSV writer is much faster for all-numeric frames
+                import pyarrow as pa
+                import pyarrow.csv as pacsv
+                # Unquoted header and values like pandas writes; every column is numeric
+                with open(filename, "wb") as f:
+                    f.write((",".join(self.fft_data) + "\n").encode())
+                    pacsv.write_csv(pa.table(self.fft_data), f,
+                                    write_options=pacsv.WriteOptions(include_header=False,
+                                                                     quoting_style="none"))
+            except ImportError:
+                pd.DataFrame(self.fft_data).to_csv(filename, index=False)
             self.status.set(f"FFT results exported to {filename}")
 
 def main():
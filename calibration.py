@@ -12,6 +12,9 @@ import os
 import sys
 import argparse
 import logging
+import multiprocessing
+from functools import cached_property
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import numpy as np
 from pathlib import Path
 from typing import List, Optional, Tuple, Union
@@ -30,9 +33,6 @@ except ImportError:
     print("Error: scipy is required. Install with: pip install scipy")
     sys.exit(1)
 
-# sigma_clipped_stats is from astropy, not scipy
-from astropy.stats import sigma_clipped_stats
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -47,18 +47,82 @@ class FITSCalibrationError(Exception):
     """Custom exception for FITS calibration errors"""
     pass
 
+# Optional bottleneck median, noticeably faster than np.median for stack combining
+try:
+    import bottleneck as bn
+    _median = bn.median
+except ImportError:
+    _median = np.median
+
+# Optional numba acceleration for the per-pixel calibration kernels
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+if HAS_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _subtract_scaled_dark_kernel(data, dark, factors, out):
+        """out = max(data - dark * factor, 0) per channel, in a single pass"""
+        num_channels, height, width = data.shape
+        for c in range(num_channels):
+            factor = factors[c]
+            for y in prange(height):
+                for x in range(width):
+                    value = data[c, y, x] - dark[c, y, x] * factor
+                    if value < 0.0:
+                        value = 0.0
+                    out[c, y, x] = value
+
+    @njit(parallel=True, cache=True)
+    def _apply_flat_kernel(data, safe_flat, norm, out):
+        """out = data * norm / safe_flat, in a single pass"""
+        num_channels, height, width = data.shape
+        for c in range(num_channels):
+            for y in prange(height):
+                for x in range(width):
+                    out[c, y, x] = (data[c, y, x] * norm) / safe_flat[c, y, x]
+
+    @njit(parallel=True, cache=True)
+    def _calibrate_kernel(data, bias, dark, factors, safe_flat, norm, out):
+        """Bias, scaled dark and flat correction fused into a single pass over the image"""
+        num_channels, height, width = data.shape
+        for c in range(num_channels):
+            factor = factors[c]
+            for y in prange(height):
+                for x in range(width):
+                    value = data[c, y, x] - bias[c, y, x]
+                    if value < 0.0:
+                        value = 0.0
+                    value = value - dark[c, y, x] * factor
+                    if value < 0.0:
+                        value = 0.0
+                    out[c, y, x] = (value * norm) / safe_flat[c, y, x]
+
+def _image_hdu(hdul):
+    """First HDU holding image data; tile-compressed files keep it in extension 1"""
+    for hdu in hdul:
+        if hdu.is_image and hdu.header.get('NAXIS', 0) > 0:
+            return hdu
+    return hdul[0]
+
 class FITSImage:
-    """Class to handle both 2D grayscale and 3D RGB FITS images"""
+    """Class to handle both 2D grayscale and 3D RGB FITS images
+    
+    Pixel data is held as float32: DSLR frames are 14/16-bit, so single precision
+    is exact for the raw values and halves memory traffic compared to float64.
+    """
     
     def __init__(self, data: np.ndarray, header: fits.Header = None):
         if len(data.shape) == 2:
             # Grayscale image - convert to shape (1, height, width) for unified processing
-            self.data = data.astype(np.float64)[np.newaxis, ...]
+            self.data = data.astype(np.float32, copy=False)[np.newaxis, ...]
             self.is_rgb = False
             self.num_channels = 1
         elif len(data.shape) == 3 and data.shape[0] == 3:
             # RGB image with shape (3, height, width)
-            self.data = data.astype(np.float64)
+            self.data = data.astype(np.float32, copy=False)
             self.is_rgb = True
             self.num_channels = 3
         else:
@@ -68,13 +132,24 @@ class FITSImage:
         self.shape = self.data.shape
         self.original_shape = data.shape
         
+    @cached_property
+    def channel_means(self) -> np.ndarray:
+        """Mean of each channel (computed once; image data is not modified after creation)"""
+        return self.data.reshape(self.num_channels, -1).mean(axis=1)
+    
+    @cached_property
+    def channel_medians(self) -> np.ndarray:
+        """Median of each channel (computed once; image data is not modified after creation)"""
+        return np.median(self.data.reshape(self.num_channels, -1), axis=1)
+    
     @classmethod
     def from_file(cls, filepath: Path) -> 'FITSImage':
         """Load FITS file (supports both grayscale and RGB)"""
         try:
             with fits.open(filepath) as hdul:
-                data = hdul[0].data
-                header = hdul[0].header
+                hdu = _image_hdu(hdul)
+                data = hdu.data
+                header = hdu.header
                 
                 if data is None:
                     raise FITSCalibrationError(f"No data found in {filepath}")
@@ -87,12 +162,12 @@ class FITSImage:
     def save_to_file(self, filepath: Path, overwrite: bool = True):
         """Save FITS image to file"""
         try:
-            # Convert back to original format for saving
+            # Convert back to original format for saving (data is already float32)
             if self.is_rgb:
-                output_data = self.data.astype(np.float32)
+                output_data = self.data
             else:
                 # Convert back to 2D for grayscale
-                output_data = self.data[0].astype(np.float32)
+                output_data = self.data[0]
             
             # Create HDU
             hdu = fits.PrimaryHDU(data=output_data, header=self.header)
@@ -106,74 +181,131 @@ class FITSImage:
     
     def get_channel_statistics(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """Get mean, median, and standard deviation for each channel"""
-        means = np.array([np.mean(self.data[i]) for i in range(self.num_channels)])
-        medians = np.array([np.median(self.data[i]) for i in range(self.num_channels)])
-        stds = np.array([np.std(self.data[i]) for i in range(self.num_channels)])
-        return means, medians, stds
+        stds = self.data.reshape(self.num_channels, -1).std(axis=1)
+        return self.channel_means, self.channel_medians, stds
 
 class MasterFrameCreator:
     """Creates master calibration frames from multiple input frames"""
     
-    def __init__(self, method: str = 'median', sigma_clip: float = 3.0):
+    def __init__(self, method: str = 'median', sigma_clip: float = 3.0, tile_rows: int = 256):
         self.method = method.lower()
         self.sigma_clip = sigma_clip
+        self.tile_rows = tile_rows
         
         if self.method not in ['mean', 'median']:
             raise FITSCalibrationError(f"Invalid combination method: {method}")
+        if self.tile_rows < 1:
+            raise FITSCalibrationError(f"Invalid tile size: {tile_rows} rows")
+    
+    @staticmethod
+    def _frame_shape(hdu) -> Tuple[int, int, int]:
+        """Unified (channels, height, width) shape of an HDU, taken from its header"""
+        shape = hdu.shape
+        if len(shape) == 0:
+            raise FITSCalibrationError("No data found")
+        if len(shape) == 2:
+            return (1,) + shape
+        if len(shape) == 3 and shape[0] == 3:
+            return shape
+        raise FITSCalibrationError(f"Expected 2D grayscale or 3D RGB data, got shape {shape}")
+    
+    @staticmethod
+    def _read_rows(hdu, rows: slice) -> np.ndarray:
+        """Read a block of rows from an HDU as (channels, rows, width) without loading the rest
+        
+        Compressed HDUs only have sections from astropy 5.3; older versions
+        decompress the whole image once and slice that.
+        """
+        source = hdu.section if hasattr(hdu, 'section') else hdu.data
+        if len(hdu.shape) == 2:
+            return source[rows, :][np.newaxis, ...]
+        return source[:, rows, :]
+    
+    def _combine(self, frame_stack: np.ndarray) -> np.ndarray:
+        """Combine a (channels, rows, width, num_frames) stack along the last (frame) axis
+        
+        Keeping the frames of each pixel contiguous makes the reductions cache friendly.
+        """
+        if self.method == 'median':
+            return _median(frame_stack, axis=-1)
+        # mean
+        if self.sigma_clip > 0:
+            # Apply sigma clipping along the frame axis for every pixel at once;
+            # clipped values come back as NaN and are ignored by the mean
+            clipped_stack = stats.sigma_clip(frame_stack, sigma=self.sigma_clip, maxiters=5,
+                                             cenfunc='median', stdfunc='std',
+                                             axis=-1, masked=False)
+            return np.nanmean(clipped_stack, axis=-1)
+        return np.mean(frame_stack, axis=-1)
     
     def create_master_frame(self, frame_paths: List[Path]) -> FITSImage:
-        """Create master frame from multiple input frames"""
+        """Create master frame from multiple input frames
+        
+        Frames are opened lazily and combined in blocks of ``tile_rows`` rows,
+        so only one block of every frame is held in memory at a time.
+        """
         if not frame_paths:
             raise FITSCalibrationError("No frames provided for master frame creation")
         
         logging.info(f"Creating master frame from {len(frame_paths)} frames using {self.method}")
         
-        # Load all frames
-        frames = []
+        # Open all frames, validating their shapes and that their data can be read
+        hduls = []
+        frame_hdus = []
         reference_shape = None
         
-        for path in frame_paths:
-            try:
-                frame = FITSImage.from_file(path)
-                if reference_shape is None:
-                    reference_shape = frame.shape
-                elif frame.shape != reference_shape:
-                    raise FITSCalibrationError(f"Frame size mismatch: {path} has shape {frame.shape}, expected {reference_shape}")
+        try:
+            for path in frame_paths:
+                try:
+                    # astropy memory-maps by default; an explicit memmap=True would make it
+                    # refuse the BZERO-scaled integer data DSLR frames are stored as
+                    hdul = fits.open(path)
+                except Exception as e:
+                    logging.warning(f"Skipping frame {path}: {str(e)}")
+                    continue
                 
-                frames.append(frame.data)
+                try:
+                    hdu = _image_hdu(hdul)
+                    shape = self._frame_shape(hdu)
+                    if reference_shape is None:
+                        reference_shape = shape
+                    elif shape != reference_shape:
+                        raise FITSCalibrationError(f"Frame size mismatch: {path} has shape {shape}, expected {reference_shape}")
+                    # Read the last row so truncated or unreadable frames are dropped here
+                    # rather than failing halfway through the tiled combine below
+                    self._read_rows(hdu, slice(shape[1] - 1, shape[1]))
+                except Exception as e:
+                    hdul.close()
+                    logging.warning(f"Skipping frame {path}: {str(e)}")
+                    continue
                 
-            except Exception as e:
-                logging.warning(f"Skipping frame {path}: {str(e)}")
-                continue
-        
-        if not frames:
-            raise FITSCalibrationError("No valid frames found")
-        
-        # Stack frames
-        frame_stack = np.array(frames)  # Shape: (num_frames, 3, height, width)
-        
-        # Apply sigma clipping and combination
-        if self.method == 'median':
-            master_data = np.median(frame_stack, axis=0)
-        else:  # mean
-            if self.sigma_clip > 0:
-                # Apply sigma clipping
-                master_data = np.zeros_like(frame_stack[0])
-                num_channels = reference_shape[0]  # Dynamic channel count
-                for c in range(num_channels):  # For each channel
-                    for y in range(reference_shape[1]):
-                        for x in range(reference_shape[2]):
-                            pixel_values = frame_stack[:, c, y, x]
-                            clipped_mean, _, _ = sigma_clipped_stats(pixel_values, sigma=self.sigma_clip)
-                            master_data[c, y, x] = clipped_mean
-            else:
-                master_data = np.mean(frame_stack, axis=0)
+                hduls.append(hdul)
+                frame_hdus.append(hdu)
+            
+            if not hduls:
+                raise FITSCalibrationError("No valid frames found")
+            
+            # Combine block by block into a preallocated master, reading every frame's
+            # rows straight into one reused stack buffer
+            num_channels, height, width = reference_shape
+            master_data = np.empty(reference_shape, dtype=np.float32)
+            tile_buffer = np.empty((num_channels, min(self.tile_rows, height), width, len(hduls)),
+                                   dtype=np.float32)
+            for y0 in range(0, height, self.tile_rows):
+                rows = slice(y0, min(y0 + self.tile_rows, height))
+                frame_stack = tile_buffer[:, :rows.stop - rows.start]
+                for i, hdu in enumerate(frame_hdus):
+                    frame_stack[..., i] = self._read_rows(hdu, rows)
+                master_data[:, rows, :] = self._combine(frame_stack)
+        finally:
+            for hdul in hduls:
+                hdul.close()
         
         # Create header with processing info
         header = fits.Header()
-        header['HISTORY'] = f'Master frame created from {len(frames)} frames'
+        header['HISTORY'] = f'Master frame created from {len(hduls)} frames'
         header['HISTORY'] = f'Combination method: {self.method}'
-        header['NFRAMES'] = len(frames)
+        header['NFRAMES'] = len(hduls)
         
         return FITSImage(master_data, header)
 
@@ -184,19 +316,19 @@ class BiasFrameProcessor:
         self.master_bias = master_bias
         logging.info(f"Bias processor initialized with master bias shape: {master_bias.shape}")
     
-    def subtract_bias(self, image: FITSImage) -> FITSImage:
+    def subtract_bias(self, image: FITSImage, copy_header: bool = True) -> FITSImage:
         """Subtract master bias from image"""
         if image.shape != self.master_bias.shape:
             raise FITSCalibrationError(f"Image shape {image.shape} doesn't match bias shape {self.master_bias.shape}")
         
         # Subtract bias from each channel
-        calibrated_data = image.data - self.master_bias.data
+        calibrated_data = np.subtract(image.data, self.master_bias.data)
         
-        # Ensure non-negative values
-        calibrated_data = np.maximum(calibrated_data, 0)
+        # Ensure non-negative values (in place, no second full-frame temporary)
+        np.maximum(calibrated_data, 0, out=calibrated_data)
         
         # Update header
-        new_header = image.header.copy()
+        new_header = image.header.copy() if copy_header else image.header
         new_header['HISTORY'] = 'Bias subtraction applied'
         
         return FITSImage(calibrated_data, new_header)
@@ -208,6 +340,8 @@ class DarkFrameProcessor:
         self.master_dark = master_dark
         self.optimize_factor = optimize_factor
         self.dark_factors = np.ones(master_dark.num_channels)  # Scaling factors for all channels
+        self._scaled_dark = None  # master_dark * dark_factors, reused while the factors are unchanged
+        self._scaled_dark_factors = None
         logging.info(f"Dark processor initialized with master dark shape: {master_dark.shape}")
     
     def _compute_optimal_dark_factor(self, image: FITSImage) -> np.ndarray:
@@ -216,38 +350,48 @@ class DarkFrameProcessor:
         Uses a more robust approach that considers the entire dark frame statistics
         rather than just hot pixels, which can be unreliable.
         """
-        factors = np.ones(image.num_channels)
-
-        for c in range(image.num_channels):
-            img_channel = image.data[c]
-            dark_channel = self.master_dark.data[c]
-
-            # Improved approach: Use median of entire frame for more stable estimate
-            # First, get the median values of both frames
-            img_median = np.median(img_channel)
-            dark_median = np.median(dark_channel)
-
-            # Compute per-pixel ratios for pixels above dark median
-            # (to avoid division by very small values)
-            mask = dark_channel > dark_median * 0.5
-
-            if np.any(mask) and dark_median > 0:
-                # Get corresponding pixels in both frames
-                img_pixels = img_channel[mask]
-                dark_pixels = dark_channel[mask]
-
-                # Compute ratios only for valid pixels
-                valid_mask = (dark_pixels > dark_median * 0.1) & (img_pixels > 0)
-                if np.any(valid_mask):
-                    ratios = img_pixels[valid_mask] / dark_pixels[valid_mask]
-
-                    # Use sigma-clipped median for robust estimate (median is more stable than mean)
-                    _, clipped_median, _ = sigma_clipped_stats(ratios, sigma=2.5, maxiters=5)
-                    factors[c] = clipped_median if not np.isnan(clipped_median) else 1.0
+        num_channels = image.num_channels
+        img = image.data
+        dark = self.master_dark.data
+
+        # Improved approach: Use median of entire frame for more stable estimate
+        # First, get the per-channel median values of both frames in one reduction each
+        # (the master dark's medians are cached on it, so they are only computed once)
+        img_medians = np.median(img.reshape(num_channels, -1), axis=1)
+        dark_medians = self.master_dark.channel_medians
+        dark_levels = dark_medians[:, np.newaxis, np.newaxis]
+
+        # Only pixels above half the dark median (to avoid division by very small values)
+        # with a positive image value take part in the ratio.
+        # With a positive dark median, dark > 0.5*median already implies dark > 0.1*median.
+        mask = dark > dark_levels * 0.5
+        valid_mask = mask & (img > 0)
+
+        # Sigma-clipped median of the ratios per channel (median is more stable than mean),
+        # computed on the valid pixels only as a compact float32 array, not a full frame
+        clipped_medians = np.full(num_channels, np.nan)
+        with warnings.catch_warnings():
+            # Quiet channels whose ratios are all clipped
+            warnings.simplefilter('ignore')
+            for c in range(num_channels):
+                valid = valid_mask[c]
+                ratios = img[c][valid]
+                ratios /= dark[c][valid]
+                if ratios.size:
+                    clipped = stats.sigma_clip(ratios, sigma=2.5, maxiters=5, masked=False, copy=False)
+                    clipped_medians[c] = np.nanmedian(clipped)
+
+        has_mask = mask.reshape(num_channels, -1).any(axis=1)
+        has_valid = valid_mask.reshape(num_channels, -1).any(axis=1)
+
+        factors = np.ones(num_channels)
+        for c in range(num_channels):
+            if has_mask[c] and dark_medians[c] > 0:
+                if has_valid[c]:
+                    factors[c] = clipped_medians[c] if not np.isnan(clipped_medians[c]) else 1.0
                 else:
                     # Fallback: use overall median ratio
-                    if dark_median > 0:
-                        factors[c] = img_median / dark_median
+                    factors[c] = img_medians[c] / dark_medians[c]
             else:
                 # If dark frame is too dim, use default factor
                 factors[c] = 1.0
@@ -259,7 +403,7 @@ class DarkFrameProcessor:
 
         return factors
     
-    def subtract_dark(self, image: FITSImage) -> FITSImage:
+    def subtract_dark(self, image: FITSImage, copy_header: bool = True) -> FITSImage:
         """Subtract dark frame with optional optimization"""
         if image.shape != self.master_dark.shape:
             raise FITSCalibrationError(f"Image shape {image.shape} doesn't match dark shape {self.master_dark.shape}")
@@ -269,22 +413,37 @@ class DarkFrameProcessor:
             self.dark_factors = self._compute_optimal_dark_factor(image)
             logging.info(f"Dark optimization factors (RGB): {self.dark_factors}")
         
-        # Apply dark subtraction with factors
-        calibrated_data = image.data.copy()
-        for c in range(image.num_channels):
-            calibrated_data[c] -= self.master_dark.data[c] * self.dark_factors[c]
-        
-        # Ensure non-negative values
-        calibrated_data = np.maximum(calibrated_data, 0)
+        # Apply dark subtraction with factors, clipping to non-negative values
+        if HAS_NUMBA:
+            calibrated_data = np.empty_like(image.data)
+            _subtract_scaled_dark_kernel(image.data, self.master_dark.data, self.dark_factors, calibrated_data)
+        else:
+            calibrated_data = np.subtract(image.data, self.scaled_dark())
+            
+            # Ensure non-negative values (in place, no second full-frame temporary)
+            np.maximum(calibrated_data, 0, out=calibrated_data)
         
         # Update header
-        new_header = image.header.copy()
-        if image.is_rgb:
-            new_header['HISTORY'] = f'Dark subtraction applied with factors: R={self.dark_factors[0]:.3f} G={self.dark_factors[1]:.3f} B={self.dark_factors[2]:.3f}'
-        else:
-            new_header['HISTORY'] = f'Dark subtraction applied with factor: {self.dark_factors[0]:.3f}'
+        new_header = image.header.copy() if copy_header else image.header
+        new_header['HISTORY'] = self.history_entry(image)
         
         return FITSImage(calibrated_data, new_header)
+    
+    def scaled_dark(self) -> np.ndarray:
+        """Master dark scaled by the per-channel factors, in one broadcast multiply
+        
+        Cached until the factors change, so without optimization it is computed only once.
+        """
+        if self._scaled_dark is None or not np.array_equal(self._scaled_dark_factors, self.dark_factors):
+            self._scaled_dark = (self.master_dark.data * self.dark_factors[:, np.newaxis, np.newaxis]).astype(np.float32)
+            self._scaled_dark_factors = self.dark_factors.copy()
+        return self._scaled_dark
+    
+    def history_entry(self, image: FITSImage) -> str:
+        """HISTORY text describing the dark subtraction applied to an image"""
+        if image.is_rgb:
+            return f'Dark subtraction applied with factors: R={self.dark_factors[0]:.3f} G={self.dark_factors[1]:.3f} B={self.dark_factors[2]:.3f}'
+        return f'Dark subtraction applied with factor: {self.dark_factors[0]:.3f}'
 
 class FlatFrameProcessor:
     """Handles flat field correction with proper color balance - DSS style"""
@@ -293,25 +452,23 @@ class FlatFrameProcessor:
         self.master_flat = master_flat
         self.balanced_flat = self._create_color_balanced_flat()
         self.normalization_factor = self._compute_normalization()
+        # Balanced flat clamped away from zero once, rather than on every frame
+        self.safe_flat = np.maximum(self.balanced_flat.data, 1e-6)
         logging.info(f"Flat processor initialized with shape: {master_flat.shape}")
         logging.info(f"Flat normalization factor: {self.normalization_factor}")
     
     def _create_color_balanced_flat(self) -> FITSImage:
         """Create color-balanced flat field by normalizing channels"""
-        raw_means = np.zeros(self.master_flat.num_channels)
-        
-        # Compute mean for each channel
-        for c in range(self.master_flat.num_channels):
-            raw_means[c] = np.mean(self.master_flat.data[c])
+        # Mean of each channel
+        raw_means = self.master_flat.channel_means.astype(np.float64)
         
         # Use the minimum mean as target to avoid amplifying noise
         target_mean = np.min(raw_means)
         
-        # Create balanced flat by scaling each channel to the target mean
-        balanced_data = np.zeros_like(self.master_flat.data)
-        for c in range(self.master_flat.num_channels):
-            scale_factor = target_mean / raw_means[c]
-            balanced_data[c] = self.master_flat.data[c] * scale_factor
+        # Create balanced flat by scaling each channel to the target mean (one broadcast multiply)
+        scale_factors = target_mean / raw_means
+        balanced_data = np.empty_like(self.master_flat.data)
+        np.multiply(self.master_flat.data, scale_factors[:, np.newaxis, np.newaxis], out=balanced_data)
         
         if self.master_flat.is_rgb:
             logging.info(f"Original flat means (RGB): {raw_means}")
@@ -326,31 +483,34 @@ class FlatFrameProcessor:
         """Compute single normalization factor for balanced flat"""
         # Use the first channel as reference (green for RGB, grayscale for mono)
         ref_channel = 1 if self.balanced_flat.is_rgb else 0
-        return np.mean(self.balanced_flat.data[ref_channel])
+        return self.balanced_flat.channel_means[ref_channel]
     
-    def apply_flat(self, image: FITSImage) -> FITSImage:
+    def apply_flat(self, image: FITSImage, copy_header: bool = True) -> FITSImage:
         """Apply flat field correction using balanced flat"""
         if image.shape != self.master_flat.shape:
             raise FITSCalibrationError(f"Image shape {image.shape} doesn't match flat shape {self.master_flat.shape}")
         
-        calibrated_data = image.data.copy()
-        
         # Apply flat correction using the balanced flat field
-        for c in range(image.num_channels):
-            flat_channel = self.balanced_flat.data[c]
-            
-            # Avoid division by very small values
-            safe_flat = np.maximum(flat_channel, 1e-6)
-            
-            # Apply flat field correction with single normalization factor
-            calibrated_data[c] = (calibrated_data[c] * self.normalization_factor) / safe_flat
+        if HAS_NUMBA:
+            calibrated_data = np.empty_like(image.data)
+            _apply_flat_kernel(image.data, self.safe_flat, self.normalization_factor, calibrated_data)
+        else:
+            calibrated_data = image.data.copy()
+            for c in range(image.num_channels):
+                # Apply flat field correction with single normalization factor
+                # (safe_flat avoids division by very small values)
+                calibrated_data[c] = (calibrated_data[c] * self.normalization_factor) / self.safe_flat[c]
         
         # Update header
-        new_header = image.header.copy()
-        correction_type = "Color-balanced" if image.is_rgb else "Flat field"
-        new_header['HISTORY'] = f'{correction_type} flat field correction applied with normalization: {self.normalization_factor:.1f}'
+        new_header = image.header.copy() if copy_header else image.header
+        new_header['HISTORY'] = self.history_entry(image)
         
         return FITSImage(calibrated_data, new_header)
+    
+    def history_entry(self, image: FITSImage) -> str:
+        """HISTORY text describing the flat correction applied to an image"""
+        correction_type = "Color-balanced" if image.is_rgb else "Flat field"
+        return f'{correction_type} flat field correction applied with normalization: {self.normalization_factor:.1f}'
 
 class DarkFlatFrameProcessor:
     """Handles dark flat frame subtraction (optional)"""
@@ -359,19 +519,19 @@ class DarkFlatFrameProcessor:
         self.master_darkflat = master_darkflat
         logging.info(f"Dark flat processor initialized with master dark flat shape: {master_darkflat.shape}")
     
-    def subtract_darkflat(self, image: FITSImage) -> FITSImage:
+    def subtract_darkflat(self, image: FITSImage, copy_header: bool = True) -> FITSImage:
         """Subtract master dark flat from image"""
         if image.shape != self.master_darkflat.shape:
             raise FITSCalibrationError(f"Image shape {image.shape} doesn't match dark flat shape {self.master_darkflat.shape}")
         
         # Subtract dark flat from each channel
-        calibrated_data = image.data - self.master_darkflat.data
+        calibrated_data = np.subtract(image.data, self.master_darkflat.data)
         
-        # Ensure non-negative values
-        calibrated_data = np.maximum(calibrated_data, 0)
+        # Ensure non-negative values (in place, no second full-frame temporary)
+        np.maximum(calibrated_data, 0, out=calibrated_data)
         
         # Update header
-        new_header = image.header.copy()
+        new_header = image.header.copy() if copy_header else image.header
         new_header['HISTORY'] = 'Dark flat subtraction applied'
         
         return FITSImage(calibrated_data, new_header)
@@ -383,17 +543,103 @@ class FITSCalibrator:
                  bias_processor: Optional[BiasFrameProcessor] = None,
                  dark_processor: Optional[DarkFrameProcessor] = None, 
                  flat_processor: Optional[FlatFrameProcessor] = None,
-                 darkflat_processor: Optional[DarkFlatFrameProcessor] = None):
+                 darkflat_processor: Optional[DarkFlatFrameProcessor] = None,
+                 use_gpu: bool = False):
         self.bias_processor = bias_processor
         self.dark_processor = dark_processor
         self.flat_processor = flat_processor
         self.darkflat_processor = darkflat_processor
+        self.use_gpu = use_gpu
+        self._gpu_kernel = None  # Fused CuPy kernel, built on first use
+        self._gpu_masters = None  # Master frames on the GPU, uploaded once
+        self._gpu_fallback_warned = False
+        
+        if use_gpu:
+            try:
+                import cupy  # noqa: F401
+            except ImportError:
+                raise FITSCalibrationError("GPU calibration requires CuPy. Install with: pip install cupy")
         
         logging.info("FITS Calibrator initialized with processors:")
         logging.info(f"  - Bias: {'Yes' if bias_processor else 'No'}")
         logging.info(f"  - Dark: {'Yes' if dark_processor else 'No'}")
         logging.info(f"  - Flat: {'Yes' if flat_processor else 'No'}")
         logging.info(f"  - Dark Flat: {'Yes' if darkflat_processor else 'No'}")
+        if use_gpu:
+            logging.info("  - GPU: Yes (CuPy)")
+    
+    def _fuse_blocker(self) -> Optional[str]:
+        """Why bias, dark and flat cannot be applied in one fused pass, or None if they can
+        
+        Dark optimization needs the bias-subtracted frame to fit its factors,
+        so it keeps the step-by-step pipeline.
+        """
+        missing = [name for name, processor in (('bias', self.bias_processor),
+                                                ('dark', self.dark_processor),
+                                                ('flat', self.flat_processor)) if processor is None]
+        if missing:
+            return f"no master {', '.join(missing)}"
+        if self.dark_processor.optimize_factor:
+            return "dark optimization fits its factors per frame"
+        return None
+    
+    def _can_fuse(self) -> bool:
+        """Whether bias, dark and flat can be applied in one fused pass"""
+        return self._fuse_blocker() is None
+    
+    def _check_master_shapes(self, image: FITSImage):
+        """Ensure the image matches the bias, dark and flat masters"""
+        for name, master in (('bias', self.bias_processor.master_bias),
+                             ('dark', self.dark_processor.master_dark),
+                             ('flat', self.flat_processor.master_flat)):
+            if image.shape != master.shape:
+                raise FITSCalibrationError(f"Image shape {image.shape} doesn't match {name} shape {master.shape}")
+    
+    def _fused_header(self, image: FITSImage) -> fits.Header:
+        """Header with the same HISTORY as the step-by-step bias, dark and flat pipeline"""
+        new_header = image.header.copy()
+        new_header['HISTORY'] = 'Bias subtraction applied'
+        new_header['HISTORY'] = self.dark_processor.history_entry(image)
+        new_header['HISTORY'] = self.flat_processor.history_entry(image)
+        return new_header
+    
+    def _calibrate_fused(self, image: FITSImage) -> FITSImage:
+        """Apply bias, dark and flat correction in a single pass over the image"""
+        self._check_master_shapes(image)
+        
+        calibrated_data = np.empty_like(image.data)
+        _calibrate_kernel(image.data, self.bias_processor.master_bias.data,
+                          self.dark_processor.master_dark.data, self.dark_processor.dark_factors,
+                          self.flat_processor.safe_flat, self.flat_processor.normalization_factor,
+                          calibrated_data)
+        
+        return FITSImage(calibrated_data, self._fused_header(image))
+    
+    def _calibrate_gpu(self, image: FITSImage) -> FITSImage:
+        """Apply bias, dark and flat correction as one fused CuPy kernel on the GPU"""
+        import cupy as cp
+        
+        self._check_master_shapes(image)
+        
+        if self._gpu_kernel is None:
+            @cp.fuse()
+            def calibrate(data, bias, dark, factors, safe_flat, norm):
+                value = cp.maximum(data - bias, 0)
+                value = cp.maximum(value - dark * factors, 0)
+                return (value * norm) / safe_flat
+            
+            self._gpu_kernel = calibrate
+            self._gpu_masters = (cp.asarray(self.bias_processor.master_bias.data),
+                                 cp.asarray(self.dark_processor.master_dark.data),
+                                 cp.asarray(self.dark_processor.dark_factors[:, np.newaxis, np.newaxis],
+                                            dtype=np.float32),
+                                 cp.asarray(self.flat_processor.safe_flat))
+        
+        bias, dark, factors, safe_flat = self._gpu_masters
+        calibrated = self._gpu_kernel(cp.asarray(image.data), bias, dark, factors, safe_flat,
+                                      np.float32(self.flat_processor.normalization_factor))
+        
+        return FITSImage(cp.asnumpy(calibrated), self._fused_header(image))
     
     def calibrate_image(self, image: FITSImage) -> FITSImage:
         """Apply full calibration pipeline to an image"""
@@ -402,17 +648,31 @@ class FITSCalibrator:
         # Apply calibrations in the correct order (following DSS methodology)
         # Order: Bias -> Dark -> Flat
         
-        if self.bias_processor:
-            logging.debug("Applying bias subtraction")
-            calibrated = self.bias_processor.subtract_bias(calibrated)
-        
-        if self.dark_processor:
-            logging.debug("Applying dark subtraction")
-            calibrated = self.dark_processor.subtract_dark(calibrated)
+        if self.use_gpu and not self._gpu_fallback_warned and not self._can_fuse():
+            logging.warning(f"GPU calibration unavailable ({self._fuse_blocker()}); using the CPU pipeline")
+            self._gpu_fallback_warned = True
         
-        if self.flat_processor:
-            logging.debug("Applying flat field correction")
-            calibrated = self.flat_processor.apply_flat(calibrated)
+        if self.use_gpu and self._can_fuse():
+            logging.debug("Applying fused bias, dark and flat correction on the GPU")
+            calibrated = self._calibrate_gpu(calibrated)
+        elif HAS_NUMBA and self._can_fuse():
+            logging.debug("Applying fused bias, dark and flat correction")
+            calibrated = self._calibrate_fused(calibrated)
+        else:
+            # Copy the header once; each step then adds its HISTORY to it in place
+            calibrated = FITSImage(image.data, image.header.copy())
+            
+            if self.bias_processor:
+                logging.debug("Applying bias subtraction")
+                calibrated = self.bias_processor.subtract_bias(calibrated, copy_header=False)
+            
+            if self.dark_processor:
+                logging.debug("Applying dark subtraction")
+                calibrated = self.dark_processor.subtract_dark(calibrated, copy_header=False)
+            
+            if self.flat_processor:
+                logging.debug("Applying flat field correction")
+                calibrated = self.flat_processor.apply_flat(calibrated, copy_header=False)
         
         # Add final calibration info to header
         calibrated.header['HISTORY'] = 'Full calibration pipeline completed'
@@ -420,16 +680,34 @@ class FITSCalibrator:
         
         return calibrated
 
-def find_fits_files(directory: Path, pattern: str = "*.fits") -> List[Path]:
-    """Find all FITS files in a directory"""
-    fits_files = list(directory.glob(pattern))
-    
-    # Also check for common FITS extensions
-    for ext in ["*.fit", "*.fts", "*.FIT", "*.FITS", "*.FTS"]:
-        fits_files.extend(directory.glob(ext))
-    
-    # Remove duplicates and sort
-    fits_files = sorted(list(set(fits_files)))
+def calibrate_light_frame(calibrator: FITSCalibrator, light_file: Path, output_path: Path) -> Path:
+    """Load, calibrate and save a single light frame"""
+    light_image = FITSImage.from_file(light_file)
+    calibrated_image = calibrator.calibrate_image(light_image)
+    calibrated_image.save_to_file(output_path)
+    return output_path
+
+# Calibrator held by each worker process; sent once per worker rather than once per frame
+_worker_calibrator = None
+
+def _init_calibration_worker(calibrator: FITSCalibrator, log_level: int = logging.INFO):
+    """Store the calibrator in a freshly started worker process"""
+    global _worker_calibrator
+    _worker_calibrator = calibrator
+    logging.getLogger().setLevel(log_level)
+
+def _calibrate_light_frame_worker(light_file: Path, output_path: Path) -> Path:
+    """Calibrate a light frame using the calibrator of the current worker process"""
+    return calibrate_light_frame(_worker_calibrator, light_file, output_path)
+
+FITS_EXTENSIONS = frozenset({".fits", ".fit", ".fts"})
+
+def find_fits_files(directory: Path, extensions: frozenset = FITS_EXTENSIONS) -> List[Path]:
+    """Find all FITS files in a directory (extensions matched case-insensitively)"""
+    # One directory scan instead of a glob per extension/case variant
+    with os.scandir(directory) as entries:
+        fits_files = sorted(Path(entry.path) for entry in entries
+                            if os.path.splitext(entry.name)[1].lower() in extensions and entry.is_file())
     
     logging.info(f"Found {len(fits_files)} FITS files in {directory}")
     return fits_files
@@ -502,6 +780,10 @@ def main():
                        help="Method for combining master frames")
     parser.add_argument("--optimize-dark", action='store_true',
                        help="Enable dark frame optimization")
+    parser.add_argument("--workers", "-j", type=int, default=1,
+                       help="Number of processes used to calibrate light frames in parallel")
+    parser.add_argument("--gpu", action='store_true',
+                       help="Calibrate light frames on the GPU with CuPy (needs bias, dark and flat)")
     parser.add_argument("--verbose", "-v", action='store_true',
                        help="Enable verbose logging")
     
@@ -591,29 +873,34 @@ def main():
                 # This follows standard CCD calibration procedures
                 if bias_processor or dark_processor:
                     logging.info("Calibrating individual flat frames before combining")
-                    calibrated_flat_frames = []
+                    frame_stack = None
+
+                    # Flats use the master dark without optimization; build that processor once
+                    flat_dark_processor = (DarkFrameProcessor(dark_processor.master_dark, optimize_factor=False)
+                                           if dark_processor else None)
 
-                    for flat_file in flat_files:
+                    for i, flat_file in enumerate(flat_files):
                         flat_frame = FITSImage.from_file(flat_file)
 
                         # Apply bias correction if available
                         if bias_processor:
-                            flat_frame = bias_processor.subtract_bias(flat_frame)
+                            flat_frame = bias_processor.subtract_bias(flat_frame, copy_header=False)
 
                         # Apply dark correction if available (no optimization for flats)
-                        if dark_processor:
-                            # Create a temporary dark processor without optimization for flats
-                            flat_dark_processor = DarkFrameProcessor(dark_processor.master_dark, optimize_factor=False)
-                            flat_frame = flat_dark_processor.subtract_dark(flat_frame)
+                        if flat_dark_processor:
+                            flat_frame = flat_dark_processor.subtract_dark(flat_frame, copy_header=False)
 
-                        calibrated_flat_frames.append(flat_frame.data)
+                        # Write each calibrated flat straight into a preallocated stack
+                        # (frames on the last axis, so each pixel's values are contiguous)
+                        if frame_stack is None:
+                            frame_stack = np.empty(flat_frame.shape + (len(flat_files),), dtype=np.float32)
+                        frame_stack[..., i] = flat_frame.data
 
                     # Combine calibrated flat frames
-                    frame_stack = np.array(calibrated_flat_frames)
                     if master_creator.method == 'median':
-                        master_flat_data = np.median(frame_stack, axis=0)
+                        master_flat_data = _median(frame_stack, axis=-1)
                     else:  # mean
-                        master_flat_data = np.mean(frame_stack, axis=0)
+                        master_flat_data = np.mean(frame_stack, axis=-1)
 
                     master_flat = FITSImage(master_flat_data)
                     master_flat.header['HISTORY'] = f'Master flat created from {len(flat_files)} bias/dark corrected frames'
@@ -649,7 +936,8 @@ def main():
             logging.info("No dark flat folder found - skipping dark flat correction (optional)")
         
         # Initialize calibrator with all processors (including optional darkflat)
-        calibrator = FITSCalibrator(bias_processor, dark_processor, flat_processor, darkflat_processor)
+        calibrator = FITSCalibrator(bias_processor, dark_processor, flat_processor, darkflat_processor,
+                                    use_gpu=args.gpu)
         
         # Process light frames
         if not light_folder.exists():
@@ -663,25 +951,60 @@ def main():
         
         logging.info(f"Processing {len(light_files)} light frames")
         
-        # Process each light frame
-        for i, light_file in enumerate(light_files):
-            try:
-                logging.info(f"Processing {i+1}/{len(light_files)}: {light_file.name}")
-                
-                # Load light frame
-                light_image = FITSImage.from_file(light_file)
-                
-                # Apply calibration
-                calibrated_image = calibrator.calibrate_image(light_image)
-                
-                # Save calibrated image
-                output_filename = light_file.stem + "_calibrated.fits"
-                output_path = output_folder / "calibrated" / output_filename
-                calibrated_image.save_to_file(output_path)
+        output_paths = [output_folder / "calibrated" / (light_file.stem + "_calibrated.fits")
+                        for light_file in light_files]
+        
+        if args.workers > 1:
+            # Frames are independent, so calibrate them in parallel worker processes.
+            # Spawned rather than forked: the numba kernels run for the masters may have
+            # started TBB threads, and a forked child of those hangs at interpreter exit
+            logging.info(f"Calibrating with {args.workers} worker processes")
+            with ProcessPoolExecutor(max_workers=args.workers,
+                                     initializer=_init_calibration_worker,
+                                     initargs=(calibrator, logging.getLogger().level),
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                futures = {executor.submit(_calibrate_light_frame_worker, light_file, output_path): light_file
+                           for light_file, output_path in zip(light_files, output_paths)}
+                for i, future in enumerate(as_completed(futures)):
+                    light_file = futures[future]
+                    try:
+                        future.result()
+                        logging.info(f"Processed {i+1}/{len(light_files)}: {light_file.name}")
+                    except Exception as e:
+                        logging.error(f"Failed to process {light_file}: {str(e)}")
+        else:
+            # Process each light frame, reading the next frame and writing the previous
+            # result in background threads while the current one is calibrated
+            # (astropy's file I/O releases the GIL, so the threads genuinely overlap)
+            def finish_save(pending):
+                save_future, saved_file = pending
+                try:
+                    save_future.result()
+                except Exception as e:
+                    logging.error(f"Failed to process {saved_file}: {str(e)}")
+            
+            with ThreadPoolExecutor(max_workers=1) as reader, ThreadPoolExecutor(max_workers=1) as writer:
+                next_load = reader.submit(FITSImage.from_file, light_files[0])
+                pending_save = None
+                for i, (light_file, output_path) in enumerate(zip(light_files, output_paths)):
+                    load = next_load
+                    if i + 1 < len(light_files):
+                        next_load = reader.submit(FITSImage.from_file, light_files[i + 1])
+                    try:
+                        logging.info(f"Processing {i+1}/{len(light_files)}: {light_file.name}")
+                        calibrated_image = calibrator.calibrate_image(load.result())
+                        
+                        # Keep at most one write in flight
+                        if pending_save is not None:
+                            finish_save(pending_save)
+                        pending_save = (writer.submit(calibrated_image.save_to_file, output_path), light_file)
+                        
+                    except Exception as e:
+                        logging.error(f"Failed to process {light_file}: {str(e)}")
+                        continue
                 
-            except Exception as e:
-                logging.error(f"Failed to process {light_file}: {str(e)}")
-                continue
+                if pending_save is not None:
+                    finish_save(pending_save)
         
         logging.info("Calibration completed successfully")
         return 0
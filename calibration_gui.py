@@ -8,11 +8,15 @@ Based on DeepSkyStacker methodology for 3D RGB FITS files
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
+import time
+import multiprocessing
 import queue
+import collections
 import logging
 import sys
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional
 
@@ -30,6 +34,21 @@ except ImportError:
     messagebox.showerror("Import Error", "Failed to import FitsViewer module")
     sys.exit(1)
 
+# Maximum number of lines kept in the log display
+LOG_MAX_LINES = 5000
+
+# Delay (ms) after the last edit of a folder path before its counter is refreshed
+COUNTER_DEBOUNCE_MS = 300
+
+# Log poll intervals (ms) while messages arrive, after one empty poll, and when idle
+LOG_POLL_ACTIVE_MS = 20
+LOG_POLL_DEFAULT_MS = 100
+LOG_POLL_IDLE_MS = 250
+
+# Upper bound on light-frame worker processes; each holds its own copy of the
+# masters plus a frame in flight, several hundred MB for 24 MP RGB data
+MAX_CALIBRATION_WORKERS = 4
+
 class LogHandler(logging.Handler):
     """Custom log handler to redirect logs to GUI"""
     
@@ -38,7 +57,201 @@ class LogHandler(logging.Handler):
         self.log_queue = log_queue
     
     def emit(self, record):
-        self.log_queue.put(self.format(record))
+        self.log_queue.append(self.format(record))
+
+class WorkerLogHandler(logging.Handler):
+    """Log handler that forwards records from the calibration process to the GUI"""
+    
+    def __init__(self, log_q):
+        super().__init__()
+        self.log_q = log_q
+    
+    def emit(self, record):
+        self.log_q.put(('log', self.format(record)))
+
+def _create_master(master_creator, frame_files, output_path):
+    """Combine one group of calibration frames and save the master"""
+    master = master_creator.create_master_frame(frame_files)
+    master.save_to_file(output_path)
+    return master
+
+def _run_calibration_worker(args, log_q, stop_event):
+    """Run the calibration process (in a separate process)
+    
+    Log lines and progress updates are sent back as ('log', text),
+    ('progress', text) and ('percent', value) tuples on log_q; a final
+    ('done', status) tuple ends the run.
+    """
+    # Route the calibration module's logging to the GUI
+    handler = WorkerLogHandler(log_q)
+    handler.setFormatter(
+        logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    )
+    logger = logging.getLogger()
+    logger.handlers.clear()
+    logger.addHandler(handler)
+    logger.setLevel(args['log_level'])
+    
+    def log(message):
+        log_q.put(('log', message))
+    
+    def progress(message):
+        log_q.put(('progress', message))
+    
+    status = 'failed'
+    try:
+        input_folder = args['input_folder']
+        light_folder = args['light_folder']
+        source_folders = args['source_folders']
+        master_method = args['master_method']
+        optimize_dark = args['optimize_dark']
+        
+        # Enhanced output folder logic - save calibrated and masters in input parent directory
+        if input_folder:
+            # Output folders will be created directly in the input parent directory
+            base_output_folder = input_folder
+            log(f"Output will be saved in input directory: {base_output_folder}")
+        else:
+            # Fallback to parent of light folder
+            base_output_folder = light_folder.parent
+            log(f"No input folder specified, using light folder parent: {base_output_folder}")
+        
+        # Create the calibrated and masters directories
+        calibrated_folder = base_output_folder / "calibrated"
+        masters_folder = base_output_folder / "masters"
+        
+        # Create output directories
+        calibrated_folder.mkdir(exist_ok=True)
+        masters_folder.mkdir(exist_ok=True)
+        
+        log(f"Created output directories:")
+        log(f"  - Calibrated images: {calibrated_folder}")
+        log(f"  - Master frames: {masters_folder}")
+        
+        # Check for existing master frames first; their source folders need no scan
+        existing_masters = calibration.check_existing_master_frames(masters_folder)
+        
+        # Scan each remaining source folder once up front
+        folder_files = {key: calibration.find_fits_files(folder)
+                        for key, folder in source_folders.items()
+                        if key not in existing_masters and folder and folder.exists()}
+        
+        # Initialize master frame creator
+        master_creator = calibration.MasterFrameCreator(method=master_method)
+        
+        # Load existing masters and create missing ones concurrently; the groups are independent
+        pending = {key: folder_files[key] for key in ('bias', 'dark', 'flat', 'darkflat')
+                   if key not in existing_masters and folder_files.get(key)}
+        masters = {}
+        if existing_masters or pending:
+            if pending:
+                progress(f"Creating new master frames: {', '.join(pending)}...")
+                # The sigma-clipped combines hold the GIL, so each group gets its own process;
+                # forked children inherit the logging routed to the GUI
+                executor_cls = ProcessPoolExecutor
+            else:
+                progress("Loading existing master frames...")
+                executor_cls = ThreadPoolExecutor
+            with executor_cls(max_workers=len(existing_masters) + len(pending)) as executor:
+                futures = {executor.submit(calibration.FITSImage.from_file, path): key
+                           for key, path in existing_masters.items()}
+                futures.update({
+                    executor.submit(_create_master, master_creator, frame_files,
+                                    masters_folder / f"master_{key}.fits"): key
+                    for key, frame_files in pending.items()
+                })
+                for future in as_completed(futures):
+                    key = futures[future]
+                    masters[key] = future.result()
+                    if key in existing_masters:
+                        log(f"Using existing master {key} frame")
+                    else:
+                        log(f"Created master {key} frame")
+        
+        # Build a processor per master type from a loaded or new master
+        master_types = (
+            ('bias', 'bias', calibration.BiasFrameProcessor, {}),
+            ('dark', 'dark', calibration.DarkFrameProcessor, {'optimize_factor': optimize_dark}),
+            ('flat', 'flat', calibration.FlatFrameProcessor, {}),
+            ('darkflat', 'dark flat', calibration.DarkFlatFrameProcessor, {})
+        )
+        processors = {}
+        for key, label, processor_cls, kwargs in master_types:
+            if key in masters:
+                processors[key] = processor_cls(masters[key], **kwargs)
+            elif key in folder_files:
+                log(f"No {label} frames found in {label} folder")
+            else:
+                log(f"No {label} folder found - skipping {label} correction")
+        
+        # Initialize calibrator with all processors (including optional darkflat)
+        calibrator = calibration.FITSCalibrator(processors.get('bias'), processors.get('dark'),
+                                                processors.get('flat'), processors.get('darkflat'))
+        
+        # Process light frames
+        light_files = folder_files.get('light', [])
+        if not light_files:
+            raise calibration.FITSCalibrationError("No light frames found")
+        
+        # Process the light frames, one per worker process when there are several
+        total = len(light_files)
+        tasks = [(light_file, calibrated_folder / (light_file.stem + "_calibrated.fits"))
+                 for light_file in light_files]
+        workers = min(os.cpu_count() or 1, MAX_CALIBRATION_WORKERS, total)
+        failed = 0
+        if workers > 1:
+            log(f"Calibrating with {workers} worker processes")
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=calibration._init_calibration_worker,
+                                     initargs=(calibrator,)) as executor:
+                futures = {executor.submit(calibration._calibrate_light_frame_worker, light_file, output_path):
+                           light_file for light_file, output_path in tasks}
+                for done, future in enumerate(as_completed(futures), start=1):
+                    light_file = futures[future]
+                    try:
+                        future.result()
+                        progress(f"Processed {done}/{total}: {light_file.name}")
+                    except Exception as e:
+                        failed += 1
+                        logging.error(f"Failed to process {light_file}: {str(e)}")
+                    log_q.put(('percent', done / total * 100))
+                    if stop_event.is_set():  # Check for stop signal
+                        executor.shutdown(cancel_futures=True)
+                        break
+        else:
+            for i, (light_file, output_path) in enumerate(tasks):
+                if stop_event.is_set():  # Check for stop signal
+                    break
+                
+                progress(f"Processing {i+1}/{total}: {light_file.name}")
+                try:
+                    calibration.calibrate_light_frame(calibrator, light_file, output_path)
+                except Exception as e:
+                    failed += 1
+                    logging.error(f"Failed to process {light_file}: {str(e)}")
+                log_q.put(('percent', (i + 1) / total * 100))
+        
+        if failed == total:
+            raise calibration.FITSCalibrationError("No light frame could be calibrated")
+        if failed:
+            log(f"{failed} of {total} light frames failed and were skipped")
+        
+        if not stop_event.is_set():
+            progress("Calibration completed successfully!")
+            log("\\n=== CALIBRATION COMPLETED SUCCESSFULLY ===\\n")
+            status = 'completed'
+        else:
+            progress("Calibration stopped by user")
+            log("\\n=== CALIBRATION STOPPED BY USER ===\\n")
+            status = 'stopped'
+            
+    except Exception as e:
+        progress(f"Calibration failed: {str(e)}")
+        log(f"\\nERROR: {str(e)}\\n")
+    
+    finally:
+        # Tell the GUI the run is over
+        log_q.put(('done', status))
 
 class FITSCalibrationGUI:
     """Main GUI application for FITS calibration"""
@@ -64,17 +277,33 @@ class FITSCalibrationGUI:
         self.optimize_dark = tk.BooleanVar(value=True)
         self.verbose_logging = tk.BooleanVar(value=False)
         
+        # FITS file lists per folder, keyed by path and invalidated on mtime change
+        self._fits_cache = {}
+        self._fits_count_cache = {}
+        
         # Processing state
         self.is_processing = False
-        self.processing_thread = None
+        self.processing_process = None
+        self.worker_queue = None
+        self.stop_event = None
+        self.pending_percent = None
+        self.last_percent_update = 0.0
         
         # Set up logging
-        self.log_queue = queue.Queue()
+        self.log_queue = collections.deque()
+        self.empty_polls = 0
         self.setup_logging()
         
         # Create GUI
         self.create_widgets()
         self.check_log_queue()
+        
+        # Refresh file counters as folder paths are edited, debounced per folder
+        self._pending_updates = {}
+        for folder_key, var in (("bias", self.bias_folder), ("dark", self.dark_folder),
+                                ("flat", self.flat_folder), ("darkflat", self.darkflat_folder),
+                                ("light", self.light_folder)):
+            var.trace_add('write', lambda *args, k=folder_key, v=var: self._schedule_counter_update(k, v))
     
     
     def setup_logging(self):
@@ -152,9 +381,9 @@ class FITSCalibrationGUI:
         auto_frame = ttk.Frame(parent)
         auto_frame.grid(row=row_start + 3, column=1, columnspan=2, sticky=tk.W, pady=5)
 
-        auto_btn = ttk.Button(auto_frame, text="Auto-Detect Subfolders",
-                             command=self.auto_detect_folders)
-        auto_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self.auto_btn = ttk.Button(auto_frame, text="Auto-Detect Subfolders",
+                                  command=self.auto_detect_folders)
+        self.auto_btn.pack(side=tk.LEFT, padx=(0, 10))
 
         # Info button for help
         info_btn = ttk.Button(auto_frame, text="?", width=3,
@@ -269,7 +498,7 @@ class FITSCalibrationGUI:
                                 sticky=(tk.W, tk.E), pady=(0, 5))
         
         # Progress bar
-        self.progress_bar = ttk.Progressbar(parent, mode='indeterminate')
+        self.progress_bar = ttk.Progressbar(parent, mode='determinate', maximum=100)
         self.progress_bar.grid(row=row_start + 1, column=0, columnspan=3,
                               sticky=(tk.W, tk.E), pady=(0, 10))
     
@@ -296,23 +525,20 @@ class FITSCalibrationGUI:
             var.set(folder)
     
     def browse_folder_with_counter(self, var, folder_key):
-        """Open folder browser dialog and update file counter"""
+        """Open folder browser dialog; the variable's trace refreshes the counter off the Tk thread"""
         folder = filedialog.askdirectory(title="Select Folder")
         if folder:
+            self._fits_cache.pop(str(Path(folder)), None)
+            self._fits_count_cache.pop(str(Path(folder)), None)
             var.set(folder)
-            self.update_folder_counter(folder_key, folder)
     
     def update_folder_counter(self, folder_key, folder_path):
         """Update the file counter for a specific folder"""
         if folder_key in self.folder_counters and folder_path:
             try:
-                from pathlib import Path
                 folder = Path(folder_path)
                 if folder.exists():
-                    fits_count = self.count_fits_files(folder)
-                    counter_text = f"({fits_count} files)"
-                    color = "green" if fits_count > 0 else "orange"
-                    self.folder_counters[folder_key].config(text=counter_text, foreground=color)
+                    self.show_folder_count(folder_key, self._fast_count_fits(folder))
                 else:
                     self.folder_counters[folder_key].config(text="(folder not found)", foreground="red")
             except Exception as e:
@@ -320,6 +546,41 @@ class FITSCalibrationGUI:
         elif folder_key in self.folder_counters:
             self.folder_counters[folder_key].config(text="(0 files)", foreground="gray")
     
+    def _schedule_counter_update(self, folder_key, var):
+        """Rescan a folder counter once its path has stopped changing"""
+        pending = self._pending_updates.get(folder_key)
+        if pending is not None:
+            self.root.after_cancel(pending)
+        self._pending_updates[folder_key] = self.root.after(
+            COUNTER_DEBOUNCE_MS, self._start_counter_update, folder_key, var)
+    
+    def _start_counter_update(self, folder_key, var):
+        """Warm the FITS count cache in a background thread, then refresh the counter"""
+        self._pending_updates.pop(folder_key, None)
+        folder_path = var.get()
+        threading.Thread(target=self._counter_update_worker,
+                         args=(folder_key, var, folder_path), daemon=True).start()
+    
+    def _counter_update_worker(self, folder_key, var, folder_path):
+        """Scan a folder off the Tk main thread (in separate thread)"""
+        if folder_path and os.path.isdir(folder_path):
+            try:
+                self._fast_count_fits(folder_path)
+            except OSError:
+                pass  # reported by update_folder_counter
+        self.root.after(0, self._apply_counter_update, folder_key, var, folder_path)
+    
+    def _apply_counter_update(self, folder_key, var, folder_path):
+        """Refresh a folder counter unless its path changed during the scan"""
+        if var.get() == folder_path:
+            self.update_folder_counter(folder_key, folder_path)
+    
+    def show_folder_count(self, folder_key, fits_count):
+        """Display a known FITS file count for a folder"""
+        counter_text = f"({fits_count} files)"
+        color = "green" if fits_count > 0 else "orange"
+        self.folder_counters[folder_key].config(text=counter_text, foreground=color)
+    
     def update_all_folder_counters(self):
         """Update all folder counters after auto-detection"""
         folder_vars = {
@@ -333,13 +594,47 @@ class FITSCalibrationGUI:
         for folder_key, folder_path in folder_vars.items():
             self.update_folder_counter(folder_key, folder_path)
     
+    def _cached_find_fits(self, folder_path):
+        """Return the FITS files in a folder, rescanning only when its mtime changes
+        
+        Used for browsing and counters only; a coarse filesystem clock can hide
+        files added right after a scan, so calibration runs always rescan.
+        """
+        folder = Path(folder_path)
+        key = str(folder)
+        mtime = folder.stat().st_mtime_ns
+        cached = self._fits_cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        fits_files = calibration.find_fits_files(folder)
+        self._fits_cache[key] = (mtime, fits_files)
+        return fits_files
+    
+    def _fast_count_fits(self, folder_path):
+        """Count the FITS files in a folder without building Path objects, cached per folder mtime"""
+        key = str(Path(folder_path))
+        mtime = os.stat(key).st_mtime_ns
+        cached = self._fits_count_cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        cached = self._fits_cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return len(cached[1])
+        
+        with os.scandir(key) as entries:
+            fits_count = sum(1 for entry in entries
+                             if os.path.splitext(entry.name)[1].lower() in calibration.FITS_EXTENSIONS
+                             and entry.is_file())
+        self._fits_count_cache[key] = (mtime, fits_count)
+        return fits_count
+    
     def count_fits_files(self, folder_path):
         """Count the number of FITS files in a folder"""
         try:
-            fits_files = calibration.find_fits_files(folder_path)
-            return len(fits_files)
+            return self._fast_count_fits(folder_path)
         except Exception as e:
-            self.log_queue.put(f"Error counting FITS files in {folder_path}: {str(e)}")
+            self.log_queue.append(f"Error counting FITS files in {folder_path}: {str(e)}")
             return 0
     
     def show_auto_detect_help(self):
@@ -386,15 +681,12 @@ Tips:
                                f"Input folder does not exist:\n{input_path}")
             return
         
-        # Frame types with their corresponding GUI variables
-        frame_types = {
-            'light': self.light_folder,
-            'bias': self.bias_folder,
-            'dark': self.dark_folder,
-            'flat': self.flat_folder,
-            'darkflat': self.darkflat_folder
-        }
-        
+        # Scan the subfolders off the Tk main thread so the window keeps redrawing
+        self.auto_btn.config(state=tk.DISABLED)
+        threading.Thread(target=self._auto_detect_worker, args=(input_folder,), daemon=True).start()
+    
+    def _auto_detect_worker(self, input_folder):
+        """Search the input folder for calibration subfolders (in separate thread)"""
         # Priority search patterns for each frame type (higher priority first)
         search_patterns = {
             'light': ['light_fits', 'light'],
@@ -404,20 +696,23 @@ Tips:
             'darkflat': ['darkflat_fits', 'darkflat']
         }
         
-        found_folders = []
-        detection_log = []
+        detected = {}
+        found_log = []
+        missing_log = []
+        counts = {}  # one scan per candidate folder
         
         # Auto-detect each frame type using priority system
-        for frame_type, var in frame_types.items():
-            patterns = search_patterns[frame_type]
+        for frame_type, patterns in search_patterns.items():
             best_folder = None
             best_count = 0
             search_log = []
             
             for pattern in patterns:
                 folder_path = input_folder / pattern
-                if folder_path.exists() and folder_path.is_dir():
-                    fits_count = self.count_fits_files(folder_path)
+                if folder_path.is_dir():
+                    if folder_path not in counts:
+                        counts[folder_path] = self.count_fits_files(folder_path)
+                    fits_count = counts[folder_path]
                     search_log.append(f"  {pattern}: {fits_count} FITS files")
                     
                     # Priority logic: prefer _fits suffix, then higher count
@@ -429,46 +724,73 @@ Tips:
                 else:
                     search_log.append(f"  {pattern}: folder not found")
             
-            # Set the best folder found
+            # Record the best folder found
             if best_folder and best_count > 0:
-                var.set(str(best_folder))
-                found_folders.append(frame_type)
-                detection_log.append(f"✓ {frame_type.upper()}: {best_folder.name} ({best_count} FITS files)")
-                self.log_queue.put(f"Auto-detected {frame_type}: {best_folder} ({best_count} files)")
+                detected[frame_type] = (best_folder, best_count)
+                found_log.append(f"✓ {frame_type.upper()}: {best_folder.name} ({best_count} FITS files)")
+                self.log_queue.append(f"Auto-detected {frame_type}: {best_folder} ({best_count} files)")
             else:
-                detection_log.append(f"✗ {frame_type.upper()}: No valid folder found")
-                self.log_queue.put(f"No valid {frame_type} folder found")
+                missing_log.append(f"✗ {frame_type.upper()}: No valid folder found")
+                self.log_queue.append(f"No valid {frame_type} folder found")
             
             # Log search details
             for log_entry in search_log:
-                self.log_queue.put(log_entry)
+                self.log_queue.append(log_entry)
+        
+        self.root.after(0, self._apply_auto_detect_result, input_folder, detected,
+                        found_log, missing_log)
+    
+    def _apply_auto_detect_result(self, input_folder, detected, found_log, missing_log):
+        """Fill in the detected folders and report the results (on the Tk main thread)"""
+        self.auto_btn.config(state=tk.NORMAL)
+        
+        # Frame types with their corresponding GUI variables
+        frame_types = {
+            'light': self.light_folder,
+            'bias': self.bias_folder,
+            'dark': self.dark_folder,
+            'flat': self.flat_folder,
+            'darkflat': self.darkflat_folder
+        }
+        
+        for frame_type, (best_folder, best_count) in detected.items():
+            frame_types[frame_type].set(str(best_folder))
         
         # Show comprehensive results with improved formatting
-        if found_folders:
-            result_msg = "Auto-Detection Successful!\n\n"
-            result_msg += "Found folders:\n" + "\n".join(f"  {log}" for log in detection_log if log.startswith("✓"))
+        if detected:
+            parts = ["Auto-Detection Successful!", "", "Found folders:"]
+            parts.extend(f"  {log}" for log in found_log)
 
             # Show what wasn't found (if any)
-            not_found = [log for log in detection_log if log.startswith("✗")]
-            if not_found and len(not_found) < len(detection_log):
-                result_msg += "\n\nNot found (optional):\n" + "\n".join(f"  {log}" for log in not_found)
+            if missing_log:
+                parts += ["", "Not found (optional):"]
+                parts.extend(f"  {log}" for log in missing_log)
 
-            result_msg += f"\n\nReady to calibrate with {len(found_folders)} frame type(s)!"
-            result_msg += "\n\nYou can manually adjust any folder below if needed."
-            messagebox.showinfo("Auto-Detection Complete", result_msg)
+            parts += ["", f"Ready to calibrate with {len(detected)} frame type(s)!",
+                      "", "You can manually adjust any folder below if needed."]
+            messagebox.showinfo("Auto-Detection Complete", "\n".join(parts))
         else:
-            result_msg = "No calibration folders found\n\n"
-            result_msg += "Searched for subfolders named:\n"
-            result_msg += "  - light_fits or light\n"
-            result_msg += "  - bias_fits or bias\n"
-            result_msg += "  - dark_fits or dark\n"
-            result_msg += "  - flat_fits or flat\n\n"
-            result_msg += f"In folder: {input_folder}\n\n"
-            result_msg += "Click the '?' button for help setting up folders"
-            messagebox.showwarning("No Folders Found", result_msg)
-    
-        # Update all folder counters after auto-detection
-        self.update_all_folder_counters()
+            parts = [
+                "No calibration folders found",
+                "",
+                "Searched for subfolders named:",
+                "  - light_fits or light",
+                "  - bias_fits or bias",
+                "  - dark_fits or dark",
+                "  - flat_fits or flat",
+                "",
+                f"In folder: {input_folder}",
+                "",
+                "Click the '?' button for help setting up folders"
+            ]
+            messagebox.showwarning("No Folders Found", "\n".join(parts))
+    
+        # Update folder counters, reusing the counts from the scan
+        for frame_type, var in frame_types.items():
+            if frame_type in detected:
+                self.show_folder_count(frame_type, detected[frame_type][1])
+            else:
+                self.update_folder_counter(frame_type, var.get())
     
     def validate_inputs(self):
         """Validate user inputs before starting calibration"""
@@ -493,7 +815,7 @@ Tips:
         return errors
     
     def start_calibration(self):
-        """Start the calibration process in a separate thread"""
+        """Start the calibration process in a separate process"""
         
         # Validate inputs
         errors = self.validate_inputs()
@@ -506,201 +828,64 @@ Tips:
         self.start_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
         self.progress_var.set("Starting calibration...")
-        self.progress_bar.start()
+        self.progress_bar['value'] = 0
+        self.pending_percent = None
+        
+        # Snapshot settings and set logging level
+        args = self.collect_calibration_args()
+        logging.getLogger().setLevel(args['log_level'])
+        
+        # Start processing in a child process so the GUI keeps its own interpreter lock
+        # (not daemonic, so it can run its own pool of calibration workers)
+        self.worker_queue = multiprocessing.Queue()
+        self.stop_event = multiprocessing.Event()
+        self.processing_process = multiprocessing.Process(
+            target=_run_calibration_worker,
+            args=(args, self.worker_queue, self.stop_event)
+        )
+        self.processing_process.start()
+    
+    def collect_calibration_args(self):
+        """Snapshot the GUI settings into a picklable dict for the calibration process"""
+        # Read the Tk variables once; each get() is a Tcl round-trip
+        input_str = self.input_folder.get()
+        light_str = self.light_folder.get()
+        folder_strs = {
+            'bias': self.bias_folder.get(),
+            'dark': self.dark_folder.get(),
+            'flat': self.flat_folder.get(),
+            'darkflat': self.darkflat_folder.get()
+        }
         
-        # Set logging level
-        logger = logging.getLogger()
-        if self.verbose_logging.get():
-            logger.setLevel(logging.DEBUG)
-        else:
-            logger.setLevel(logging.INFO)
+        input_folder = Path(input_str) if input_str else None
+        light_folder = Path(light_str)
         
-        # Start processing thread
-        self.processing_thread = threading.Thread(target=self.run_calibration, daemon=True)
-        self.processing_thread.start()
-    
-    def run_calibration(self):
-        """Run the calibration process (in separate thread)"""
-        try:
-            # Create paths
-            input_folder = Path(self.input_folder.get()) if self.input_folder.get() else None
-            light_folder = Path(self.light_folder.get())
-            
-            # Enhanced output folder logic - save calibrated and masters in input parent directory
-            if input_folder:
-                # Output folders will be created directly in the input parent directory
-                base_output_folder = input_folder
-                self.log_queue.put(f"Output will be saved in input directory: {base_output_folder}")
-            else:
-                # Fallback to parent of light folder
-                base_output_folder = light_folder.parent
-                self.log_queue.put(f"No input folder specified, using light folder parent: {base_output_folder}")
-            
-            # Create the calibrated and masters directories
-            calibrated_folder = base_output_folder / "calibrated"
-            masters_folder = base_output_folder / "masters"
-            
-            # Create output directories
-            calibrated_folder.mkdir(exist_ok=True)
-            masters_folder.mkdir(exist_ok=True)
-            
-            self.log_queue.put(f"Created output directories:")
-            self.log_queue.put(f"  - Calibrated images: {calibrated_folder}")
-            self.log_queue.put(f"  - Master frames: {masters_folder}")
-            
-            # Check for existing master frames first
-            existing_masters = calibration.check_existing_master_frames(masters_folder)
-            
-            # Initialize master frame creator
-            master_creator = calibration.MasterFrameCreator(method=self.master_method.get())
-            
-            # Initialize processors
-            bias_processor = None
-            dark_processor = None
-            flat_processor = None
-            darkflat_processor = None
-            
-            # Get folder paths with fallback to input subfolders
-            bias_folder = None
-            dark_folder = None
-            flat_folder = None
-            darkflat_folder = None
-            
-            if self.bias_folder.get():
-                bias_folder = Path(self.bias_folder.get())
-            elif input_folder:
-                bias_folder = input_folder / "bias"
-                
-            if self.dark_folder.get():
-                dark_folder = Path(self.dark_folder.get())
-            elif input_folder:
-                dark_folder = input_folder / "dark"
-                
-            if self.flat_folder.get():
-                flat_folder = Path(self.flat_folder.get())
+        # Get folder paths with fallback to input subfolders
+        source_folders = {}
+        for key, folder_str in folder_strs.items():
+            if folder_str:
+                source_folders[key] = Path(folder_str)
             elif input_folder:
-                flat_folder = input_folder / "flat"
-                
-            if self.darkflat_folder.get():
-                darkflat_folder = Path(self.darkflat_folder.get())
-            elif input_folder:
-                darkflat_folder = input_folder / "darkflat"
-            
-            # Handle bias frames (check existing or create new)
-            if 'bias' in existing_masters:
-                self.progress_var.set("Using existing master bias frame...")
-                master_bias = calibration.FITSImage.from_file(existing_masters['bias'])
-                bias_processor = calibration.BiasFrameProcessor(master_bias)
-            elif bias_folder and bias_folder.exists():
-                bias_files = calibration.find_fits_files(bias_folder)
-                if bias_files:
-                    self.progress_var.set("Creating new master bias frame...")
-                    master_bias = master_creator.create_master_frame(bias_files)
-                    master_bias.save_to_file(masters_folder / "master_bias.fits")
-                    bias_processor = calibration.BiasFrameProcessor(master_bias)
-                else:
-                    self.log_queue.put("No bias frames found in bias folder")
-            else:
-                self.log_queue.put("No bias folder found - skipping bias correction")
-            
-            # Handle dark frames (check existing or create new)
-            if 'dark' in existing_masters:
-                self.progress_var.set("Using existing master dark frame...")
-                master_dark = calibration.FITSImage.from_file(existing_masters['dark'])
-                dark_processor = calibration.DarkFrameProcessor(master_dark, optimize_factor=self.optimize_dark.get())
-            elif dark_folder and dark_folder.exists():
-                dark_files = calibration.find_fits_files(dark_folder)
-                if dark_files:
-                    self.progress_var.set("Creating new master dark frame...")
-                    master_dark = master_creator.create_master_frame(dark_files)
-                    master_dark.save_to_file(masters_folder / "master_dark.fits")
-                    dark_processor = calibration.DarkFrameProcessor(master_dark, optimize_factor=self.optimize_dark.get())
-                else:
-                    self.log_queue.put("No dark frames found in dark folder")
-            else:
-                self.log_queue.put("No dark folder found - skipping dark correction")
-            
-            # Handle flat frames (check existing or create new)
-            if 'flat' in existing_masters:
-                self.progress_var.set("Using existing master flat frame...")
-                master_flat = calibration.FITSImage.from_file(existing_masters['flat'])
-                flat_processor = calibration.FlatFrameProcessor(master_flat)
-            elif flat_folder and flat_folder.exists():
-                flat_files = calibration.find_fits_files(flat_folder)
-                if flat_files:
-                    self.progress_var.set("Creating new master flat frame with color balance...")
-                    master_flat = master_creator.create_master_frame(flat_files)
-                    master_flat.save_to_file(masters_folder / "master_flat.fits")
-                    flat_processor = calibration.FlatFrameProcessor(master_flat)
-                else:
-                    self.log_queue.put("No flat frames found in flat folder")
-            else:
-                self.log_queue.put("No flat folder found - skipping flat correction")
-            
-            # Handle dark flat frames (optional - check existing or create new)
-            if 'darkflat' in existing_masters:
-                self.progress_var.set("Using existing master dark flat frame...")
-                master_darkflat = calibration.FITSImage.from_file(existing_masters['darkflat'])
-                darkflat_processor = calibration.DarkFlatFrameProcessor(master_darkflat)
-            elif darkflat_folder and darkflat_folder.exists():
-                darkflat_files = calibration.find_fits_files(darkflat_folder)
-                if darkflat_files:
-                    self.progress_var.set("Creating new master dark flat frame...")
-                    master_darkflat = master_creator.create_master_frame(darkflat_files)
-                    master_darkflat.save_to_file(masters_folder / "master_darkflat.fits")
-                    darkflat_processor = calibration.DarkFlatFrameProcessor(master_darkflat)
-                else:
-                    self.log_queue.put("Dark flat folder exists but no dark flat frames found")
-            else:
-                self.log_queue.put("No dark flat folder found - skipping dark flat correction (optional)")
-            
-            # Initialize calibrator with all processors (including optional darkflat)
-            calibrator = calibration.FITSCalibrator(bias_processor, dark_processor, flat_processor, darkflat_processor)
-            
-            # Process light frames
-            light_files = calibration.find_fits_files(light_folder)
-            if not light_files:
-                raise calibration.FITSCalibrationError("No light frames found")
-            
-            # Process each light frame
-            for i, light_file in enumerate(light_files):
-                if not self.is_processing:  # Check for stop signal
-                    break
-                
-                self.progress_var.set(f"Processing {i+1}/{len(light_files)}: {light_file.name}")
-                
-                # Load light frame
-                light_image = calibration.FITSImage.from_file(light_file)
-                
-                # Apply calibration
-                calibrated_image = calibrator.calibrate_image(light_image)
-                
-                # Save calibrated image
-                output_filename = light_file.stem + "_calibrated.fits"
-                output_path = calibrated_folder / output_filename
-                calibrated_image.save_to_file(output_path)
-            
-            if self.is_processing:
-                self.progress_var.set("Calibration completed successfully!")
-                self.log_queue.put("\\n=== CALIBRATION COMPLETED SUCCESSFULLY ===\\n")
-                
-                # Offer to view the results
-                self.root.after(1000, self.offer_to_view_results)
+                source_folders[key] = input_folder / key
             else:
-                self.progress_var.set("Calibration stopped by user")
-                self.log_queue.put("\\n=== CALIBRATION STOPPED BY USER ===\\n")
-                
-        except Exception as e:
-            self.progress_var.set(f"Calibration failed: {str(e)}")
-            self.log_queue.put(f"\\nERROR: {str(e)}\\n")
-        
-        finally:
-            # Reset UI state
-            self.root.after(0, self.calibration_finished)
+                source_folders[key] = None
+        source_folders['light'] = light_folder
+        
+        # The folders are scanned by the calibration process, keeping disk access off the Tk thread
+        return {
+            'input_folder': input_folder,
+            'light_folder': light_folder,
+            'source_folders': source_folders,
+            'master_method': self.master_method.get(),
+            'optimize_dark': self.optimize_dark.get(),
+            'log_level': logging.DEBUG if self.verbose_logging.get() else logging.INFO
+        }
     
     def stop_calibration(self):
         """Stop the calibration process"""
         self.is_processing = False
+        if self.stop_event is not None:
+            self.stop_event.set()
         self.stop_btn.config(state=tk.DISABLED)
         self.progress_var.set("Stopping calibration...")
     
@@ -709,7 +894,14 @@ Tips:
         self.is_processing = False
         self.start_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
-        self.progress_bar.stop()
+        
+        if self.processing_process is not None:
+            self.processing_process.join()
+            self.processing_process = None
+        if self.worker_queue is not None:
+            self.worker_queue.close()
+            self.worker_queue = None
+        self.stop_event = None
     
     def clear_log(self):
         """Clear the log display"""
@@ -728,7 +920,7 @@ Tips:
             return
         
         # Find FITS files in light folder
-        fits_files = calibration.find_fits_files(light_path)
+        fits_files = self._cached_find_fits(light_path)
         if not fits_files:
             messagebox.showwarning("No FITS Files", "No FITS files found in the light frames folder.")
             return
@@ -865,17 +1057,82 @@ Tips:
     
     def check_log_queue(self):
         """Check for new log messages and update display"""
-        try:
+        messages = []
+        while True:
+            try:
+                messages.append(self.log_queue.popleft())
+            except IndexError:
+                break
+        received = len(messages)
+        if self.worker_queue is not None:
+            received += self.read_worker_messages(messages)
+        
+        # One insert per poll instead of one per line
+        if messages:
+            self.log_text.insert(tk.END, "\n".join(messages) + "\n")
+            line_count = int(self.log_text.index('end-1c').split('.')[0])
+            if line_count > LOG_MAX_LINES:
+                self.log_text.delete('1.0', f'{line_count - LOG_MAX_LINES}.0')
+            self.log_text.see(tk.END)
+        
+        # Schedule next check: poll fast while messages are flowing, back off when idle
+        if received:
+            self.empty_polls = 0
+            delay = LOG_POLL_ACTIVE_MS
+        else:
+            self.empty_polls += 1
+            delay = LOG_POLL_IDLE_MS if self.empty_polls >= 2 else LOG_POLL_DEFAULT_MS
+        self.root.after(delay, self.check_log_queue)
+
+    def read_worker_messages(self, messages):
+        """Route messages from the calibration process to the log and progress display"""
+        status = None
+        progress_text = None
+        received = 0
+        # A second pass picks up anything flushed just before the process exited
+        for _ in range(2):
             while True:
-                message = self.log_queue.get_nowait()
-                self.log_text.insert(tk.END, message + "\\n")
-                self.log_text.see(tk.END)
-                self.log_text.update()
-        except queue.Empty:
-            pass
+                try:
+                    kind, text = self.worker_queue.get_nowait()
+                except queue.Empty:
+                    break
+                received += 1
+                if kind == 'log':
+                    messages.append(text)
+                elif kind == 'progress':
+                    progress_text = text
+                elif kind == 'percent':
+                    self.pending_percent = text
+                else:
+                    status = text
+            if status is not None or self.processing_process.is_alive():
+                break
+        
+        if status is None and not self.processing_process.is_alive():
+            exitcode = self.processing_process.exitcode
+            messages.append(f"ERROR: Calibration process exited unexpectedly (exit code {exitcode})")
+            progress_text = "Calibration failed"
+            status = 'failed'
+        
+        # Only the latest status line of this poll is shown
+        if progress_text is not None:
+            self.progress_var.set(progress_text)
+        
+        # Redraw the progress bar at most every 100 ms
+        now = time.monotonic()
+        if self.pending_percent is not None and \
+           (status is not None or now - self.last_percent_update >= 0.1):
+            self.progress_bar['value'] = self.pending_percent
+            self.pending_percent = None
+            self.last_percent_update = now
+        
+        if status is not None:
+            self.calibration_finished()
+            if status == 'completed':
+                # Offer to view the results
+                self.root.after(1000, self.offer_to_view_results)
         
-        # Schedule next check
-        self.root.after(100, self.check_log_queue)
+        return received
 
 def main():
     """Main function to start the GUI application"""
@@ -912,6 +1169,15 @@ def main():
         root.mainloop()
     except KeyboardInterrupt:
         root.quit()
+    
+    # Don't leave a calibration running after the window closes
+    process = app.processing_process
+    if process is not None and process.is_alive():
+        app.stop_event.set()
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -8,116 +8,287 @@ import threading
 import time
 import json
 import copy
+import queue
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def C2F(inputDir, outputDir, progress_callback=None, stop_event=None):
+# Optional numba kernel for the RGB to grayscale conversion
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Optional cfitsio-backed FITS I/O; astropy is used when fitsio is not installed
+try:
+    import fitsio
+    HAS_FITSIO = True
+except ImportError:
+    HAS_FITSIO = False
+
+# Luminance weights for R, G, B (common luminance perception values)
+WEIGHTS = np.array([0.2989, 0.5870, 0.1140], dtype=np.float32)
+
+# Input bytes per row strip in the numpy grayscale path, small enough to stay in cache
+GRAY_TILE_BYTES = 512 * 1024
+
+if HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _rgb_to_gray_kernel(R, G, B, weights, out):
+        """out = weighted sum of R, G, B, one row per thread."""
+        w_r, w_g, w_b = weights[0], weights[1], weights[2]
+        for i in prange(R.shape[0]):
+            for j in range(R.shape[1]):
+                out[i, j] = (w_r * np.float32(R[i, j]) + w_g * np.float32(G[i, j])
+                             + w_b * np.float32(B[i, j]))
+
+# Rows per section read when an RGB cube is streamed from disk
+READ_STRIP_ROWS = 256
+
+# Upper bound on CR3 conversion processes; each holds a 16-bit demosaiced frame
+# plus its plane buffer, several hundred MB for a 24 MP raw
+MAX_CONVERT_WORKERS = 4
+
+# GUI refresh: log queue poll interval (ms) and minimum seconds between progress updates
+LOG_POLL_MS = 100
+PROGRESS_INTERVAL = 0.1
+
+def _image_hdu(hdul):
+    """First HDU holding image data; tile-compressed files keep it in extension 1"""
+    for hdu in hdul:
+        if hdu.is_image and hdu.header.get('NAXIS', 0) > 0:
+            return hdu
+    return hdul[0]
+
+def _read_rgb_as_gray(path, gray_buf=None):
+    """Grayscale image of a (3, H, W) RGB FITS file, or None if the image has another shape.
+
+    gray_buf is reused for the result when its shape matches. The cube is
+    read a strip of rows at a time (fitsio slices or astropy sections), so
+    it is never loaded (and scaled) in full. Tile-compressed files keep the
+    image in the first extension.
+    """
+    if HAS_FITSIO:
+        with fitsio.FITS(path) as fits_file:
+            hdu = next((h for h in fits_file if h.has_data()), fits_file[0])
+            return _strips_to_gray(tuple(hdu.get_dims()), lambda rows: hdu[:, rows, :], gray_buf)
+    with fits.open(path) as hdul:
+        hdu = _image_hdu(hdul)
+        # CompImageHDU has no section before astropy 5.3; decompress it whole there
+        source = hdu.section if hasattr(hdu, 'section') else hdu.data
+        return _strips_to_gray(hdu.shape, lambda rows: source[:, rows, :], gray_buf)
+
+def _strips_to_gray(shape, read_rows, gray_buf):
+    """Convert a (3, H, W) cube to grayscale strip by strip; read_rows(rows) returns one strip"""
+    if len(shape) != 3 or shape[0] != 3:
+        return None
+    if gray_buf is None or gray_buf.shape != shape[1:]:
+        gray_buf = np.empty(shape[1:], dtype=np.float32)
+    for y0 in range(0, shape[1], READ_STRIP_ROWS):
+        rows = slice(y0, min(y0 + READ_STRIP_ROWS, shape[1]))
+        convert_rgb_to_gray_data(read_rows(rows), out=gray_buf[rows])
+    return gray_buf
+
+def _write_fits(path, data, compress=False):
+    """Write data as a FITS image, replacing any existing file.
+
+    With compress, the image is tile-compressed into the first extension:
+    RICE for integer data, lossless GZIP for floating-point data (RICE
+    would quantize it).
+    """
+    is_float = data.dtype.kind == 'f'
+    if HAS_FITSIO:
+        if not compress:
+            fitsio.write(path, data, clobber=True)
+        elif is_float:
+            fitsio.write(path, data, compress='gzip_2', qlevel=None, clobber=True)
+        else:
+            fitsio.write(path, data, compress='rice', clobber=True)
+        return
+    if not compress:
+        hdul = fits.PrimaryHDU(data)
+    elif is_float:
+        hdul = fits.HDUList([fits.PrimaryHDU(),
+                             fits.CompImageHDU(data, compression_type='GZIP_2', quantize_level=0.0)])
+    else:
+        hdul = fits.HDUList([fits.PrimaryHDU(), fits.CompImageHDU(data, compression_type='RICE_1')])
+    hdul.writeto(path, overwrite=True, output_verify='ignore', checksum=False)
+
+# Per-worker (3, H, W) buffer reused across RGB conversions
+_rgb_buffers = threading.local()
+
+def _convert_one_cr3(args):
+    """Convert one CR3 file to FITS (runs in a worker process).
+
+    args is (inputPath, outputPath, mode, compress); mode 'raw' writes the
+    Bayer plane, 'rgb' writes the demosaiced image as a (3, H, W) cube.
+    """
+    inputPath, outputPath, mode, compress = args
+    with rawpy.imread(inputPath) as raw:
+        if mode == 'rgb':
+            rgb = raw.postprocess(output_bps=16)
+        else:
+            # Write the flipped view while raw_image is still valid; no copy needed
+            _write_fits(outputPath, raw.raw_image[::-1], compress)
+            return outputPath
+    _write_fits(outputPath, _rgb_to_planes(rgb), compress)
+    return outputPath
+
+def _rgb_to_planes(rgb):
+    """Flip a (H, W, 3) image vertically into a reused (3, H, W) uint16 buffer."""
+    shape = (3,) + rgb.shape[:2]
+    buf = getattr(_rgb_buffers, 'buf', None)
+    if buf is None or buf.shape != shape:
+        buf = _rgb_buffers.buf = np.empty(shape, dtype=np.uint16)
+    # Vertical flip (for consistency) and channel transpose in one contiguous store per channel
+    for c in range(3):
+        np.copyto(buf[c], rgb[::-1, :, c])
+    return buf
+
+def _scan_files(directory, extensions):
+    """Directory entries of the files in directory ending with one of extensions (any case)."""
+    with os.scandir(directory) as it:
+        return [e for e in it if e.is_file() and e.name.lower().endswith(extensions)]
+
+def _report_error(log_queue, filename, e):
+    """Queue a per-file error for the GUI, or show it directly when there is no queue."""
+    if log_queue is not None:
+        log_queue.put(("error", filename, str(e)))
+    else:
+        messagebox.showerror("Error", f"Error converting {filename}: {e}")
+
+def _report_info(log_queue, message):
+    """Queue a notice for the GUI, or show it directly when there is no queue."""
+    if log_queue is not None:
+        log_queue.put(("info", message))
+    else:
+        messagebox.showinfo("Info", message)
+
+def _run_cr3_conversions(tasks, progress_callback=None, stop_event=None, log_queue=None):
+    """Convert CR3 files in parallel, reporting progress as each one finishes.
+
+    tasks is a list of (filename, _convert_one_cr3 args) pairs.
+    """
+    total_files = len(tasks)
+    workers = max(1, min(os.cpu_count() or 1, MAX_CONVERT_WORKERS, total_files))
+    # Spawn rather than fork: forking after numba's thread pool has started can hang
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {}
+        for filename, args in tasks:
+            if stop_event and stop_event.is_set():
+                break
+            futures[executor.submit(_convert_one_cr3, args)] = filename
+        for done, future in enumerate(as_completed(futures), start=1):
+            filename = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                _report_error(log_queue, filename, e)
+            if progress_callback:
+                progress_callback(done, total_files, f"Converted {filename}")
+            if stop_event and stop_event.is_set():
+                executor.shutdown(cancel_futures=True)
+                break
+
+def C2F(inputDir, outputDir, progress_callback=None, stop_event=None, log_queue=None, compress=False):
     if not os.path.exists(outputDir):
         os.makedirs(outputDir)
-    filesToProcess = [f for f in os.listdir(inputDir) if f.lower().endswith('.cr3')]
-    total_files = len(filesToProcess)
-    if not filesToProcess:
-        messagebox.showinfo("Info", "No CR3 files found in the input directory.")
+    entries = _scan_files(inputDir, '.cr3')
+    total_files = len(entries)
+    if not entries:
+        _report_info(log_queue, "No CR3 files found in the input directory.")
         return
-    for i, filename in enumerate(filesToProcess):
-        if stop_event and stop_event.is_set():
-            break
-        if progress_callback:
-            progress_callback(i, total_files, f"Converting {filename}")
-        inputPath = os.path.join(inputDir, filename)
-        outputFilename = os.path.splitext(filename)[0] + '.fits'
-        outputPath = os.path.join(outputDir, outputFilename)
-        try:
-            with rawpy.imread(inputPath) as raw:
-                rawImage = np.flipud(raw.raw_image.copy())
-            hdu = fits.PrimaryHDU(rawImage)
-            hdul = fits.HDUList([hdu])
-            hdul.writeto(outputPath, overwrite=True)
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not convert {inputPath}: {e}")
+    tasks = []
+    for e in entries:
+        outputPath = os.path.join(outputDir, e.name.rsplit('.', 1)[0] + '.fits')
+        tasks.append((e.name, (e.path, outputPath, 'raw', compress)))
+    _run_cr3_conversions(tasks, progress_callback, stop_event, log_queue)
     if progress_callback:
         progress_callback(total_files, total_files, "Conversion completed")
 
-def C2F_RGB(inputDir, outputDir, progress_callback=None, stop_event=None):
+def C2F_RGB(inputDir, outputDir, progress_callback=None, stop_event=None, log_queue=None, compress=False):
     if not os.path.exists(outputDir):
         os.makedirs(outputDir)
-    filesToProcess = [f for f in os.listdir(inputDir) if f.lower().endswith('.cr3')]
-    total_files = len(filesToProcess)
-    for i, filename in enumerate(filesToProcess):
-        if stop_event and stop_event.is_set():
-            break
-        if progress_callback:
-            progress_callback(i, total_files, f"Converting {filename} to RGB")
-        inputPath = os.path.join(inputDir, filename)
-        outputFilename = os.path.splitext(filename)[0] + '_rgb.fits'
-        outputPath = os.path.join(outputDir, outputFilename)
-        try:
-            with rawpy.imread(inputPath) as raw:
-                rgb = raw.postprocess(output_bps=16)
-            rgb_flipped = np.flipud(rgb) # Apply vertical flip for consistency
-            rgb_transposed = np.transpose(rgb_flipped, (2, 0, 1)).astype(np.uint16)
-            hdu = fits.PrimaryHDU(rgb_transposed)
-            hdul = fits.HDUList([hdu])
-            hdul.writeto(outputPath, overwrite=True)
-        except Exception as e:
-            messagebox.showerror("Error", f"Error converting {filename}: {e}")
+    entries = _scan_files(inputDir, '.cr3')
+    total_files = len(entries)
+    tasks = []
+    for e in entries:
+        outputPath = os.path.join(outputDir, e.name.rsplit('.', 1)[0] + '_rgb.fits')
+        tasks.append((e.name, (e.path, outputPath, 'rgb', compress)))
+    _run_cr3_conversions(tasks, progress_callback, stop_event, log_queue)
     if progress_callback:
         progress_callback(total_files, total_files, "RGB conversion completed")
 
-def F_RGB2F_Gray(inputDir, outputDir, progress_callback=None, stop_event=None):
+def F_RGB2F_Gray(inputDir, outputDir, progress_callback=None, stop_event=None, log_queue=None, compress=False):
     if not os.path.exists(outputDir):
         os.makedirs(outputDir)
-    fitsFiles = [f for f in os.listdir(inputDir) if f.lower().endswith(('.fits', '.fit', '.fts'))]
-    total_files = len(fitsFiles)
-    if not fitsFiles:
-        messagebox.showinfo("Info", "No FITS files found in the input directory.")
+    fitsEntries = _scan_files(inputDir, ('.fits', '.fit', '.fts'))
+    total_files = len(fitsEntries)
+    if not fitsEntries:
+        _report_info(log_queue, "No FITS files found in the input directory.")
         return
 
     converted_count = 0
-    for i, fitsFile in enumerate(fitsFiles):
+    gray_buf = None  # reused while the image size stays the same
+    for i, entry in enumerate(fitsEntries):
+        fitsFile = entry.name
         if stop_event and stop_event.is_set():
             break
         if progress_callback:
             progress_callback(i, total_files, f"Converting {fitsFile} to grayscale")
-        fitsPath = os.path.join(inputDir, fitsFile)
         try:
-            with fits.open(fitsPath) as hdul:
-                data = hdul[0].data
-                if data.ndim == 3 and data.shape[0] == 3:
-                    # Apply weighted conversion for RGB to grayscale
-                    # Weights are common luminance perception values
-                    R, G, B = data[0, :, :], data[1, :, :], data[2, :, :]
-                    gray_data = 0.2989 * R + 0.5870 * G + 0.1140 * B
-                    grayFilename = fitsFile.replace('_rgb', '')
-                    grayPath = os.path.join(outputDir, grayFilename)
-                    hdu = fits.PrimaryHDU(gray_data.astype(np.float32))
-                    hdu.writeto(grayPath, overwrite=True)
-                    converted_count += 1
-                else:
-                    print(f"Skipping {fitsFile}: Not a 3-channel color FITS file.")
-                    continue
+            # Apply weighted conversion for RGB to grayscale
+            gray = _read_rgb_as_gray(entry.path, gray_buf)
+            if gray is not None:
+                gray_buf = gray
+                grayFilename = fitsFile.replace('_rgb', '')
+                grayPath = os.path.join(outputDir, grayFilename)
+                _write_fits(grayPath, gray_buf, compress)
+                converted_count += 1
+            else:
+                print(f"Skipping {fitsFile}: Not a 3-channel color FITS file.")
+                continue
         except Exception as e:
-            messagebox.showerror("Error", f"Error converting {fitsFile}: {e}")
+            _report_error(log_queue, fitsFile, e)
 
     if converted_count == 0:
-        messagebox.showinfo("Info", "No color FITS files were found to convert.")
+        _report_info(log_queue, "No color FITS files were found to convert.")
     elif progress_callback:
         progress_callback(total_files, total_files, f"Grayscale conversion completed - {converted_count} files")
 
-def convert_rgb_to_gray_data(rgb_data):
+def convert_rgb_to_gray_data(rgb_data, out=None):
     """
     Converts a 3-channel RGB FITS data array to a grayscale data array
     using weighted luminance conversion.
     Assumes input rgb_data has shape (3, H, W).
+    If given, out is a float32 (H, W) array the result is written into.
     """
     if rgb_data.ndim == 3 and rgb_data.shape[0] == 3:
-        R, G, B = rgb_data[0, :, :], rgb_data[1, :, :], rgb_data[2, :, :]
-        gray_data = 0.2989 * R + 0.5870 * G + 0.1140 * B
-        return gray_data
+        if out is None:
+            out = np.empty(rgb_data.shape[1:], dtype=np.float32)
+        # numba cannot take the byte-swapped arrays astropy returns
+        if HAS_NUMBA and rgb_data.dtype.isnative:
+            _rgb_to_gray_kernel(rgb_data[0], rgb_data[1], rgb_data[2], WEIGHTS, out)
+            return out
+        # One float32 weighted sum over the channel axis, no per-channel temporaries,
+        # done in strips of rows so each strip's three channels are read from cache
+        height, width = rgb_data.shape[1:]
+        tile_rows = max(1, GRAY_TILE_BYTES // (3 * width * rgb_data.itemsize))
+        for y0 in range(0, height, tile_rows):
+            rows = slice(y0, y0 + tile_rows)
+            np.einsum('c,chw->hw', WEIGHTS, rgb_data[:, rows], out=out[rows],
+                      dtype=np.float32, casting='same_kind')
+        return out
     else:
         raise ValueError("Input data must be a 3-channel RGB array (shape: 3, H, W).")
 
 class ConverterApp:
     def __init__(self, master):
         self.master = master
+        self.log_queue = queue.Queue()  # log lines, progress and per-file errors for the Tk thread
+        self.error_count = 0
+        self._last_ui_update = 0.0
         master.title("FITS Format Converter")
         master.geometry("600x400")
 
@@ -125,6 +296,7 @@ class ConverterApp:
         self.outputDir = tk.StringVar()
         self.inputFormat = tk.StringVar()
         self.outputFormat = tk.StringVar()
+        self.compress_var = tk.BooleanVar(value=False)
         
         # Conversion state
         self.is_converting = False
@@ -152,6 +324,7 @@ class ConverterApp:
         outputFormats = ["FITS (Grayscale)", "FITS (Color)"]
         self.outputFormat.set(outputFormats[1])  # Default to FITS (Color)
         ttk.Combobox(master, textvariable=self.outputFormat, values=outputFormats, state="readonly").grid(row=3, column=1, sticky="ew", padx=5, pady=5)
+        ttk.Checkbutton(master, text="Tile-compress (RICE/GZIP)", variable=self.compress_var).grid(row=3, column=2, sticky="w", padx=5, pady=5)
 
         # Control buttons
         button_frame = tk.Frame(master)
@@ -184,12 +357,8 @@ class ConverterApp:
         self.log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # Display any pending log messages from initialization
-        if hasattr(self, '_pending_log_messages'):
-            for message in self._pending_log_messages:
-                self.log_text.insert(tk.END, message)
-            delattr(self, '_pending_log_messages')
-            self.log_text.see(tk.END)
+        # Start polling the log queue
+        self.master.after(LOG_POLL_MS, self.check_log_queue)
         
         # Configure grid weights
         master.grid_rowconfigure(6, weight=1)
@@ -208,25 +377,16 @@ class ConverterApp:
         self.outputDir.set(filedialog.askdirectory())
 
     def log_message(self, message):
-        """Add message to log output"""
-        # Handle case where log_text hasn't been created yet (during initialization)
-        if hasattr(self, 'log_text'):
-            self.log_text.insert(tk.END, f"{time.strftime('%H:%M:%S')} - {message}\n")
-            self.log_text.see(tk.END)
-            self.master.update()
-        else:
-            # Store messages for later when log_text is available
-            if not hasattr(self, '_pending_log_messages'):
-                self._pending_log_messages = []
-            self._pending_log_messages.append(f"{time.strftime('%H:%M:%S')} - {message}\n")
+        """Queue a message for the log output (safe to call from any thread)"""
+        self.log_queue.put(("log", f"{time.strftime('%H:%M:%S')} - {message}\n"))
     
     def update_progress(self, current, total, message):
-        """Update progress bar and label"""
-        if total > 0:
-            progress_percent = (current / total) * 100
-            self.progress_bar["value"] = progress_percent
-        self.progress_label.config(text=f"{message} ({current}/{total})")
-        self.master.update()
+        """Queue a progress update, dropping updates that come too quickly (except the last)"""
+        now = time.monotonic()
+        if now - self._last_ui_update < PROGRESS_INTERVAL and current < total:
+            return
+        self._last_ui_update = now
+        self.log_queue.put(("progress", current, total, message))
     
     def convert(self):
         if self.is_converting:
@@ -236,6 +396,7 @@ class ConverterApp:
         outputDir = self.outputDir.get()
         inputFormat = self.inputFormat.get()
         outputFormat = self.outputFormat.get()
+        compress = self.compress_var.get()
 
         if not inputDir or not outputDir:
             messagebox.showerror("Error", "Please select both input and output directories.")
@@ -249,6 +410,8 @@ class ConverterApp:
         self.log_text.delete(1.0, tk.END)
         self.progress_bar["value"] = 0
         self.stop_event.clear()
+        self.error_count = 0
+        self._last_ui_update = 0.0
         
         # Update UI state
         self.is_converting = True
@@ -258,22 +421,24 @@ class ConverterApp:
         self.log_message(f"Starting conversion: {inputFormat} → {outputFormat}")
         self.log_message(f"Input folder: {inputDir}")
         self.log_message(f"Output folder: {outputDir}")
+        if compress:
+            self.log_message("Writing tile-compressed FITS (image stored in the first extension)")
         
         # Start conversion in separate thread
         self.conversion_thread = threading.Thread(target=self.run_conversion, 
-                                                args=(inputDir, outputDir, inputFormat, outputFormat),
+                                                args=(inputDir, outputDir, inputFormat, outputFormat, compress),
                                                 daemon=True)
         self.conversion_thread.start()
     
-    def run_conversion(self, inputDir, outputDir, inputFormat, outputFormat):
+    def run_conversion(self, inputDir, outputDir, inputFormat, outputFormat, compress=False):
         """Run conversion in separate thread"""
         try:
             if inputFormat == "CR3" and outputFormat == "FITS (Grayscale)":
-                C2F(inputDir, outputDir, self.update_progress, self.stop_event)
+                C2F(inputDir, outputDir, self.update_progress, self.stop_event, self.log_queue, compress)
             elif inputFormat == "CR3" and outputFormat == "FITS (Color)":
-                C2F_RGB(inputDir, outputDir, self.update_progress, self.stop_event)
+                C2F_RGB(inputDir, outputDir, self.update_progress, self.stop_event, self.log_queue, compress)
             elif inputFormat == "FITS (Color)" and outputFormat == "FITS (Grayscale)":
-                F_RGB2F_Gray(inputDir, outputDir, self.update_progress, self.stop_event)
+                F_RGB2F_Gray(inputDir, outputDir, self.update_progress, self.stop_event, self.log_queue, compress)
             else:
                 self.master.after(0, lambda: messagebox.showerror("Error", 
                     f"Conversion from {inputFormat} to {outputFormat} is not supported."))
@@ -282,8 +447,7 @@ class ConverterApp:
             if self.stop_event.is_set():
                 self.master.after(0, lambda: self.log_message("Conversion stopped by user"))
             else:
-                self.master.after(0, lambda: self.log_message("Conversion completed successfully!"))
-                self.master.after(0, lambda: messagebox.showinfo("Success", "Conversion complete."))
+                self.master.after(0, self.show_completion)
                 
         except Exception as e:
             self.master.after(0, lambda: self.log_message(f"Error: {str(e)}"))
@@ -292,6 +456,53 @@ class ConverterApp:
             # Reset UI state
             self.master.after(0, self.conversion_finished)
     
+    def check_log_queue(self):
+        """Periodically apply queued log messages and progress"""
+        self.drain_log_queue()
+        self.master.after(LOG_POLL_MS, self.check_log_queue)
+    
+    def drain_log_queue(self):
+        """Apply everything queued so far on the Tk thread: one log insert, latest progress only"""
+        lines = []
+        notices = []
+        progress = None
+        while True:
+            try:
+                item = self.log_queue.get_nowait()
+            except queue.Empty:
+                break
+            kind = item[0]
+            if kind == "log":
+                lines.append(item[1])
+            elif kind == "progress":
+                progress = item[1:]
+            elif kind == "error":
+                self.error_count += 1
+                lines.append(f"{time.strftime('%H:%M:%S')} - Error converting {item[1]}: {item[2]}\n")
+            elif kind == "info":
+                notices.append(item[1])
+                lines.append(f"{time.strftime('%H:%M:%S')} - {item[1]}\n")
+        if lines:
+            self.log_text.insert(tk.END, "".join(lines))
+            self.log_text.see(tk.END)
+        for notice in notices:
+            messagebox.showinfo("Info", notice)
+        if progress is not None:
+            current, total, message = progress
+            if total > 0:
+                self.progress_bar["value"] = (current / total) * 100
+            self.progress_label.config(text=f"{message} ({current}/{total})")
+    
+    def show_completion(self):
+        """Report the finished conversion, mentioning any files that failed"""
+        self.log_message("Conversion completed successfully!")
+        self.drain_log_queue()
+        if self.error_count:
+            messagebox.showwarning("Conversion complete",
+                f"Conversion complete, but {self.error_count} file(s) could not be converted. See the log for details.")
+        else:
+            messagebox.showinfo("Success", "Conversion complete.")
+    
     def stop_conversion(self):
         """Stop the conversion process"""
         self.stop_event.set()
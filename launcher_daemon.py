@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Astronomy Toolbox - Pre-warmed Tool Launcher
+Started by main.py on Linux. Imports the heavy scientific libraries once,
+then reads one JSON command per line from stdin ({"tool": "/path/to/tool.py"})
+and forks a child that runs the tool as __main__, so a tool starts without
+paying for interpreter startup and library imports again.
+
+Each command is answered with one JSON line ({"ok": true} or {"error": "..."})
+on the file descriptor passed as the first argument; stdout stays free for
+the tools' own output.
+"""
+
+import importlib
+import json
+import os
+import runpy
+import signal
+import sys
+import traceback
+
+# Imported up front when installed; the GUI toolkit is deliberately not
+# initialised here, each tool creates its own Tk root after the fork
+PRELOAD_MODULES = ("numpy", "scipy", "astropy.io.fits", "astropy.stats", "matplotlib")
+
+def preload():
+    """Import whichever of the preload modules are installed"""
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+def run_tool(tool_path, replies=None):
+    """Fork a child that runs tool_path as a script; returns in the daemon only"""
+    if os.fork():
+        return
+
+    # Child: undo the daemon's process setup so the tool behaves as if started on its own
+    if replies is not None:
+        replies.close()
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, sys.stdin.fileno())
+    os.close(devnull)
+    sys.argv = [tool_path]
+    sys.path[0] = os.path.dirname(tool_path)
+
+    try:
+        runpy.run_path(tool_path, run_name="__main__")
+    except SystemExit:
+        raise
+    except BaseException:
+        traceback.print_exc()
+        raise SystemExit(1)
+    # Leave through the normal interpreter exit so the tool's atexit handlers run
+    raise SystemExit(0)
+
+def main():
+    """Serve launch commands until stdin is closed"""
+    # Children are never waited for; let the kernel reap them
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    replies = os.fdopen(int(sys.argv[1]), "w", buffering=1) if len(sys.argv) > 1 else None
+    preload()
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            command = json.loads(line)
+            run_tool(command["tool"], replies)
+            reply = {"ok": True}
+        except Exception as e:
+            print(f"launcher_daemon: could not launch from {line.strip()!r}: {e}", file=sys.stderr, flush=True)
+            reply = {"error": str(e)}
+        if replies is not None:
+            replies.write(json.dumps(reply) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,8 @@ from tkinter import ttk, messagebox, filedialog
 import subprocess
 import sys
 import os
-from pathlib import Path
+import importlib.util
+import json
 import threading
 
 class AstronomyToolbox:
@@ -19,6 +20,12 @@ class AstronomyToolbox:
         self.root.title("Astronomy Toolbox")
         self.root.geometry("800x800")
 
+        # Pre-warmed launcher process (Linux only); tools are started with Popen without it
+        self.launcher = None
+        self.launcher_replies = None
+        self.launcher_lock = threading.Lock()
+        self.start_launcher()
+
         # Create main interface
         self.create_header()
         self.create_workflow_section()
@@ -165,6 +172,61 @@ class AstronomyToolbox:
                                 font=('Arial', 10), fg='gray')
         version_label.pack(side=tk.RIGHT, padx=10, pady=5)
 
+    def start_launcher(self):
+        """Start the pre-warmed launcher daemon on Linux
+
+        Forking a process that has loaded the scientific stack is only safe on
+        Linux; macOS frameworks do not survive a fork without exec.
+        """
+        launcher_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "launcher_daemon.py")
+        if not sys.platform.startswith("linux") or not os.path.exists(launcher_path):
+            return
+        # The daemon answers each launch request on its own pipe
+        reply_read, reply_write = os.pipe()
+        try:
+            self.launcher = subprocess.Popen([sys.executable, "-u", launcher_path, str(reply_write)],
+                                             stdin=subprocess.PIPE, text=True, pass_fds=(reply_write,))
+            self.launcher_replies = os.fdopen(reply_read, "r")
+        except OSError:
+            os.close(reply_read)
+            self.launcher = None
+        finally:
+            os.close(reply_write)
+
+    def stop_launcher(self):
+        """Let the launcher daemon exit; tools it started keep running"""
+        if self.launcher is not None and self.launcher.poll() is None:
+            try:
+                self.launcher.stdin.close()
+            except OSError:
+                pass
+        if self.launcher_replies is not None:
+            self.launcher_replies.close()
+        self.launcher = None
+        self.launcher_replies = None
+
+    def send_to_launcher(self, tool_path):
+        """Ask the launcher daemon to start a tool
+
+        Returns False if the daemon is not available, and raises OSError if it
+        could not start the tool.
+        """
+        with self.launcher_lock:
+            if self.launcher is None or self.launcher.poll() is not None:
+                return False
+            try:
+                self.launcher.stdin.write(json.dumps({"tool": os.path.abspath(tool_path)}) + "\n")
+                self.launcher.stdin.flush()
+                reply = self.launcher_replies.readline()
+            except OSError:
+                return False
+            if not reply:  # The daemon exited before answering
+                return False
+            error = json.loads(reply).get("error")
+            if error:
+                raise OSError(error)
+            return True
+
     def launch_tool(self, filename):
         """Launch a specific tool"""
         try:
@@ -188,10 +250,12 @@ class AstronomyToolbox:
             # Launch in separate process
             def launch_process():
                 try:
-                    subprocess.Popen([sys.executable, tool_path])
+                    if not self.send_to_launcher(tool_path):
+                        subprocess.Popen([sys.executable, tool_path])
                     self.root.after(2000, lambda: self.status_var.set("Ready - All tools available"))
                 except Exception as e:
-                    self.root.after(0, lambda: messagebox.showerror("Launch Error", f"Failed to launch {filename}:\n{str(e)}"))
+                    message = f"Failed to launch {filename}:\n{str(e)}"
+                    self.root.after(0, lambda: messagebox.showerror("Launch Error", message))
                     self.root.after(0, lambda: self.status_var.set("Launch failed"))
 
             threading.Thread(target=launch_process, daemon=True).start()
@@ -202,17 +266,27 @@ class AstronomyToolbox:
 
     def open_results_folder(self):
         """Open the results folder"""
-        results_path = Path("results")
-        if results_path.exists():
-            if sys.platform == "darwin":  # macOS
-                subprocess.run(["open", str(results_path)])
-            elif sys.platform == "win32":  # Windows
-                subprocess.run(["explorer", str(results_path)])
-            else:  # Linux
-                subprocess.run(["xdg-open", str(results_path)])
-            self.status_var.set("Results folder opened")
-        else:
-            messagebox.showinfo("Results Folder", "Results folder doesn't exist yet.\nRun photometry analysis to create it.")
+        results_path = "results"
+
+        # The file manager call (and the exists() check on a slow drive) can block,
+        # so run them off the Tk thread and hand the outcome back with after()
+        def open_folder():
+            if not os.path.isdir(results_path):
+                self.root.after(0, lambda: messagebox.showinfo("Results Folder", "Results folder doesn't exist yet.\nRun photometry analysis to create it."))
+                return
+            try:
+                if sys.platform == "darwin":  # macOS
+                    subprocess.run(["open", results_path])
+                elif sys.platform == "win32":  # Windows
+                    subprocess.run(["explorer", results_path])
+                else:  # Linux
+                    subprocess.run(["xdg-open", results_path])
+                self.root.after(0, lambda: self.status_var.set("Results folder opened"))
+            except Exception as e:
+                message = f"Could not open results folder: {e}"
+                self.root.after(0, lambda: self.status_var.set(message))
+
+        threading.Thread(target=open_folder, daemon=True).start()
 
     def show_documentation(self):
         """Show documentation information"""
@@ -294,13 +368,11 @@ For technical support, check the individual tool documentation."""
         all_good = True
 
         for dep, desc in dependencies.items():
-            try:
-                if dep == 'tkinter':
-                    import tkinter
-                else:
-                    __import__(dep)
+            # Locate the package without importing it: importing astropy, photutils
+            # and rawpy into the launcher would take seconds and is not needed here
+            if importlib.util.find_spec(dep) is not None:
                 results.append(f"OK: {dep} - {desc}")
-            except ImportError:
+            else:
                 results.append(f"MISSING: {dep} - {desc}")
                 all_good = False
 
@@ -313,11 +385,16 @@ For technical support, check the individual tool documentation."""
         results.append("\nTool Files:")
         script_dir = os.path.dirname(os.path.abspath(__file__))
         
+        # One directory listing each instead of a stat call per tool
+        present = set(os.listdir(script_dir))
+        cwd_present = None
         for tool in tool_files:
-            tool_path = os.path.join(script_dir, tool)
-            if os.path.exists(tool_path):
+            if tool in present:
                 results.append(f"OK: {tool}")
-            elif os.path.exists(tool):  # Fallback to current directory
+                continue
+            if cwd_present is None:  # Fallback to current directory, listed only if needed
+                cwd_present = set(os.listdir(os.getcwd()))
+            if tool in cwd_present:
                 results.append(f"OK: {tool} (in current directory)")
             else:
                 results.append(f"MISSING: {tool}")
@@ -347,6 +424,7 @@ def main():
     root.geometry(f"+{x}+{y}")
 
     root.mainloop()
+    app.stop_launcher()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
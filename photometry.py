@@ -41,6 +41,14 @@ except ImportError as e:
     exit(1)
 
 
+def _image_hdu(hdul):
+    """First HDU holding image data; tile-compressed files keep it in extension 1"""
+    for hdu in hdul:
+        if hdu.is_image and hdu.header.get('NAXIS', 0) > 0:
+            return hdu
+    return hdul[0]
+
+
 class AperturePhotometryGUI:
     def __init__(self, root):
         self.root = root
@@ -668,8 +676,9 @@ class AperturePhotometryGUI:
             self.logger.info(f"Loading first FITS file: {os.path.basename(first_file)}")
 
             with fits.open(first_file) as hdul:
-                self.current_image_data = hdul[0].data
-                self.current_image_header = hdul[0].header
+                hdu = _image_hdu(hdul)
+                self.current_image_data = hdu.data
+                self.current_image_header = hdu.header
 
                 # Log image information
                 self.logger.debug(f"Image shape: {self.current_image_data.shape}")
@@ -1291,8 +1300,9 @@ class AperturePhotometryGUI:
             self.logger.debug(f"Processing image {image_index+1}: {filename}")
 
             with fits.open(fits_file) as hdul:
-                original_data = hdul[0].data
-                header = hdul[0].header
+                hdu = _image_hdu(hdul)
+                original_data = hdu.data
+                header = hdu.header
 
                 # Check if we have RGB data
                 is_rgb = len(original_data.shape) == 3 and original_data.shape[0] == 3
@@ -2326,8 +2336,9 @@ class AperturePhotometryGUI:
 
             # Load the image
             with fits.open(fits_file) as hdul:
-                image_data = hdul[0].data
-                header = hdul[0].header
+                hdu = _image_hdu(hdul)
+                image_data = hdu.data
+                header = hdu.header
 
                 # Store current image data
                 self.current_image_data = image_data
@@ -2597,8 +2608,9 @@ class AperturePhotometryGUI:
 
             # Load the image
             with fits.open(fits_file) as hdul:
-                image_data = hdul[0].data
-                header = hdul[0].header
+                hdu = _image_hdu(hdul)
+                image_data = hdu.data
+                header = hdu.header
 
                 # Store current image data
                 self.current_image_data = image_data
@@ -3165,8 +3177,9 @@ class AperturePhotometryGUI:
 
             # Load the image
             with fits.open(fits_file) as hdul:
-                image_data = hdul[0].data
-                header = hdul[0].header
+                hdu = _image_hdu(hdul)
+                image_data = hdu.data
+                header = hdu.header
 
                 # Store current image data
                 self.current_image_data = image_data
@@ -3274,8 +3287,9 @@ class AperturePhotometryGUI:
 
             # Load the image
             with fits.open(fits_file) as hdul:
-                image_data = hdul[0].data
-                header = hdul[0].header
+                hdu = _image_hdu(hdul)
+                image_data = hdu.data
+                header = hdu.header
 
                 # Store current image data
                 self.current_image_data = image_data
@@ -0,0 +1,37 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from analyze import sampling_step
+
+
+class SamplingStepTest(unittest.TestCase):
+    def test_regular_julian_dates_take_fast_path(self):
+        from astropy.time import Time, TimeDelta
+        start = Time(datetime(2024, 5, 1, 21, 0, 0))
+        jd = (start + TimeDelta(np.arange(2000) * 30.0, format='sec')).jd
+        step, regular = sampling_step(jd)
+        self.assertTrue(regular)
+        self.assertAlmostEqual(step * 86400.0, 30.0, places=4)
+
+    def test_plain_jd_grid_takes_fast_path(self):
+        jd = 2460431.375 + np.arange(500) * (10.0 / 86400.0)
+        step, regular = sampling_step(jd)
+        self.assertTrue(regular)
+        self.assertAlmostEqual(step * 86400.0, 10.0, places=4)
+
+    def test_jittered_times_use_median_step(self):
+        rng = np.random.default_rng(0)
+        jd = 2460431.375 + (np.arange(500) * 30.0 + rng.uniform(-1.0, 1.0, 500)) / 86400.0
+        step, regular = sampling_step(jd)
+        self.assertFalse(regular)
+        self.assertEqual(step, np.median(np.diff(jd)))
+
+
+if __name__ == "__main__":
+    unittest.main()
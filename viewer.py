@@ -9,6 +9,13 @@ import numpy as np
 import os
 import json
 
+def _image_hdu(hdul):
+    """First HDU holding image data; tile-compressed files keep it in extension 1"""
+    for hdu in hdul:
+        if hdu.is_image and hdu.header.get('NAXIS', 0) > 0:
+            return hdu
+    return hdul[0]
+
 class FitsViewer:
     def __init__(self, master, filename=None):
         self.master = master
@@ -59,7 +66,7 @@ class FitsViewer:
     def open_file(self, filename):
         try:
             with fits.open(filename) as hdul:
-                image_data = hdul[0].data
+                image_data = _image_hdu(hdul).data
             self.show_fits_image(image_data, filename)
         except FileNotFoundError:
             messagebox.showerror("Error", f"File not found: {filename}")